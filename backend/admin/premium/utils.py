@@ -11,15 +11,16 @@ import logging
 
 # Optional JSON logger (premium installer log)
 try:
-    from premium.utils.logger import create_category_logger  # type: ignore
+    from premium.utils.logger import create_category_logger, read_log_categories  # type: ignore
 except Exception:  # pragma: no cover
     create_category_logger = None  # type: ignore
+    read_log_categories = None  # type: ignore
 import json
 import tempfile
 
 
-# Path to the premium installer log file
-PREMIUM_LOG_PATH = "/var/log/homeserver/premium_installer.log"
+# Path to the premium installer log file (JSON Lines, see premium/utils/logger.py)
+PREMIUM_LOG_PATH = "/var/log/homeserver/premium_installer.jsonl"
 
 
 def delete_premium_tab_folder(tab_name: str, get_tab_status_list_func) -> Dict[str, Any]:
@@ -103,7 +104,7 @@ def delete_premium_tab_folder(tab_name: str, get_tab_status_list_func) -> Dict[s
 
 
 def premium_json_log(category: str, message: str, level: str = 'info') -> None:
-    """Write a message to the premium JSON log (premium_installer.log).
+    """Write a message to the premium JSON log (premium_installer.jsonl).
     Falls back silently if JSON logger is unavailable.
     """
     try:
@@ -144,15 +145,16 @@ def get_installer_logs() -> Dict[str, Any]:
                 "error": None
             }
         
-        # Read and parse JSON log file
-        try:
-            with open(PREMIUM_LOG_PATH, 'r') as f:
-                log_data = json.load(f)
-        except json.JSONDecodeError as e:
+        if read_log_categories is None:
             return {
                 "success": False,
-                "error": f"Failed to parse JSON log file: {str(e)}"
+                "error": "Premium log reader is unavailable"
             }
+        
+        # Rebuild per-category logs from the JSON Lines records with the installer's own reader
+        try:
+            with open(PREMIUM_LOG_PATH, 'r') as f:
+                log_data = read_log_categories(f)
         except Exception as e:
             return {
                 "success": False,
@@ -158,7 +158,9 @@ class PremiumInstaller:
             category_logger.info("=== INSTALLATION PHASE ===")
             
             # File operations
-            if not self._perform_file_operations(tab_path, category_logger):
+            files_ok = self._perform_file_operations(tab_path, category_logger)
+            self.installation_tracker.invalidate()
+            if not files_ok:
                 return False
             
             # Package installations
@@ -594,6 +596,10 @@ class PremiumInstaller:
                     
                     if status.get('individual_failures'):
                         category_logger.warning(f"Individual failures: {', '.join(status['individual_failures'])}")
+            elif status.get('fallback_outcome') == "skipped":
+                category_logger.warning("=== BATCH INSTALLATION NOT FINALIZED ===")
+                category_logger.warning(f"Frontend rebuild or service restart failed; unchanged tabs were not retried: "
+                                        f"{', '.join(status.get('skipped_tabs', []))}")
             else:
                 category_logger.error("=== BATCH INSTALLATION FAILED ===")
                 category_logger.error(f"Failed tabs: {', '.join(status.get('failed_tabs', []))}")
@@ -917,6 +923,10 @@ class PremiumInstaller:
                     
                     if status.get('individual_failures'):
                         category_logger.warning(f"Individual failures: {', '.join(status['individual_failures'])}")
+            elif status.get('fallback_outcome') == "skipped":
+                category_logger.warning("=== BATCH REINSTALLATION NOT FINALIZED ===")
+                category_logger.warning(f"Frontend rebuild or service restart failed; unchanged tabs were not retried: "
+                                        f"{', '.join(status.get('skipped_tabs', []))}")
             else:
                 category_logger.error("=== BATCH REINSTALLATION FAILED ===")
                 category_logger.error(f"Failed tabs: {', '.join(status.get('failed_tabs', []))}")
@@ -935,7 +945,8 @@ class PremiumInstaller:
                 "message": "No batch installation has been performed"
             }
         
-        return self.batch_manager._get_batch_status()
+        # Batch status is a read-only view; hand out a plain, JSON-serializable copy
+        return dict(self.batch_manager._get_batch_status())
 
 
 def main():
@@ -1255,6 +1266,9 @@ EXAMPLES:
             import traceback
             traceback.print_exc()
         return 1
+    finally:
+        # Write out and fsync every category log before the process exits
+        PremiumJSONLogger.close_all()
 
 
 if __name__ == "__main__":
@@ -18,7 +18,7 @@ from .package_manager import PackageManager, PackageInstallationState, SystemPac
 from .config_manager import ConfigManager, ServiceManager, BuildManager
 from .uninstall_manager import UninstallManager
 from .batch_manager import BatchManager, BatchInstallationState
-from .installation_tracker import InstallationTracker
+from .installation_tracker import InstallationTracker, InstallationStatus
 from .logger import PremiumJSONLogger, CategoryLogger, create_category_logger
 
 __all__ = [
@@ -55,6 +55,7 @@ __all__ = [
     
     # Installation tracking
     'InstallationTracker',
+    'InstallationStatus',
     
     # JSON Category Logging
     'PremiumJSONLogger',
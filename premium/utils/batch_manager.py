@@ -9,10 +9,17 @@ tracking and rollback capabilities.
 
 import os
 import json
+import asyncio
+import hashlib
 import logging
 import shutil
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, field
+import random
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Mapping, Optional, Set, Tuple, Any
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 
 from .file_operations import FileOperationsManager, FileOperation
@@ -22,6 +29,133 @@ from .validation import ValidationManager
 from .version_checker import SemanticVersionChecker
 from .logger import create_category_logger
 
+# Persisted content fingerprints of successfully installed tabs
+TAB_CHECKSUM_CACHE_PATH = "/var/lib/homeserver/tab_checksums/checksums.json"
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Concurrent tabs allowed per prepare stage. Files and config run one tab at a time because
+# every tab shares one FileOperationsManager (copy targets, operation history) and one
+# homeserver.json; packages allows one tab per ecosystem (pip, npm, system)
+PREPARE_STAGE_CAPACITY = {"files": 1, "packages": 3, "config": 1}
+
+# Retry policy for transient build/restart failures (full jitter exponential backoff).
+# Each circuit breaker call wraps a full retry run; see _CircuitBreaker
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4.0
+
+
+def _atomic_write(path: str, payload: bytes) -> None:
+    """Write payload to path via a temp file and rename so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(temp_path, path)
+
+
+def discard_tab_checksum(tab_name: str, cache_path: str = TAB_CHECKSUM_CACHE_PATH) -> bool:
+    """Forget a tab's installed checksum so its next install is never skipped as unchanged."""
+    try:
+        with open(cache_path, 'r') as f:
+            checksums = json.load(f)
+    except FileNotFoundError:
+        return True
+    except (OSError, json.JSONDecodeError):
+        return False
+    
+    if not isinstance(checksums, dict) or tab_name not in checksums:
+        return True
+    del checksums[tab_name]
+    try:
+        _atomic_write(cache_path, json.dumps(checksums, indent=2, sort_keys=True).encode('utf-8'))
+        return True
+    except OSError:
+        return False
+
+
+def _run_coroutine(coro):
+    """Run a coroutine to completion, even when the caller is already inside an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # asyncio.run refuses to nest; give the coroutine its own loop on a helper thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class _LazyJoin:
+    """Defers ', '.join(...) until a log record is actually formatted."""
+    
+    __slots__ = ("items",)
+    
+    def __init__(self, items):
+        self.items = items
+    
+    def __str__(self) -> str:
+        return ', '.join(self.items)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a circuit breaker is open and the wrapped operation is skipped."""
+
+
+class _CircuitBreaker:
+    """Fail fast after repeated failures of an expensive operation (frontend build, service restart).
+    
+    After ``failure_threshold`` consecutive failures the circuit opens and calls raise
+    CircuitOpenError without running the operation. Once ``reset_after`` seconds have
+    passed, a single probe call is allowed through; success closes the circuit again.
+    
+    A failure is one failed ``call``, not one run of the operation: wrapped around
+    _retry_with_backoff, each call already runs it up to RETRY_ATTEMPTS times, so the
+    circuit opens after failure_threshold * RETRY_ATTEMPTS runs.
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 3, reset_after: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+    
+    def call(self, fn: Callable[..., bool], *args, **kwargs) -> bool:
+        """Run fn, treating a falsy result or an exception as a failure."""
+        if self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_after:
+            raise CircuitOpenError(f"Circuit open for {self.name} after {self.consecutive_failures} consecutive failures")
+        
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._record_failure()
+            raise
+        
+        if result:
+            self.consecutive_failures = 0
+            self.opened_at = None
+        else:
+            self._record_failure()
+        return result
+    
+    def reset(self) -> None:
+        """Close the circuit and forget earlier failures."""
+        self.consecutive_failures = 0
+        self.opened_at = None
+    
+    def _record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            # Opening (or re-opening after a failed half-open probe) restarts the timer
+            self.opened_at = time.monotonic()
+
+
+@dataclass(slots=True)
+class _PendingTab:
+    """A tab queued for individual installation, with its name derived once."""
+    path: str
+    name: str
+
 
 @dataclass
 class BatchInstallationState:
@@ -41,15 +175,35 @@ class BatchInstallationState:
     skipped_tabs: List[str] = field(default_factory=list)
     batch_start_time: Optional[datetime] = None
     batch_end_time: Optional[datetime] = None
+    batch_start_monotonic: Optional[float] = None
+    batch_end_monotonic: Optional[float] = None
     
     # Deferred operations tracking
     deferred_builds: List[str] = field(default_factory=list)
     deferred_service_restarts: List[str] = field(default_factory=list)
     
-    # Fallback state
+    # Fallback state; outcome is "succeeded", "failed" or "skipped" (every tab unchanged)
     fallback_attempted: bool = False
-    individual_successes: List[str] = field(default_factory=list)
-    individual_failures: List[str] = field(default_factory=list)
+    fallback_outcome: Optional[str] = None
+    # Insertion-ordered sets (dict keys) so membership checks are O(1) and retries never duplicate
+    individual_successes: Dict[str, None] = field(default_factory=dict)
+    individual_failures: Dict[str, None] = field(default_factory=dict)
+    
+    # Directories known to exist during this batch, shared with file_operations
+    created_dirs: Set[str] = field(default_factory=set)
+    
+    # Tab content fingerprints: persisted cache loaded once per batch, and freshly computed ones
+    tab_checksums: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    tab_fingerprints: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    
+    # Tab name -> requested path, built once from tabs_to_install
+    tab_paths_by_name: Dict[str, str] = field(default_factory=dict)
+    
+    # Rollback handles of managers that may have mutated the system, in registration order
+    rollback_stack: List[Callable[[], None]] = field(default_factory=list)
+    
+    # Number of retries needed per operation, to surface flaky build/restart steps
+    retry_counts: Dict[str, int] = field(default_factory=dict)
 
 
 class BatchManager:
@@ -58,11 +212,13 @@ class BatchManager:
     def __init__(self, logger, 
                  venv_path: str = "/var/www/homeserver/venv",
                  package_json_path: str = "/var/www/homeserver/package.json",
-                 homeserver_config_path: str = "/var/www/homeserver/src/config/homeserver.json"):
+                 homeserver_config_path: str = "/var/www/homeserver/src/config/homeserver.json",
+                 checksum_cache_path: str = TAB_CHECKSUM_CACHE_PATH):
         self.logger = logger
         self.venv_path = venv_path
         self.package_json_path = package_json_path
         self.homeserver_config_path = homeserver_config_path
+        self.checksum_cache_path = checksum_cache_path
         
         # Initialize utility managers
         self.file_operations = FileOperationsManager(logger)
@@ -75,6 +231,28 @@ class BatchManager:
         
         # Batch state
         self.batch_state: Optional[BatchInstallationState] = None
+        
+        # Status of a completed batch never changes, so it is built once and reused
+        self._last_status_dict: Optional[Mapping[str, Any]] = None
+        
+        # Guards batch_state mutations; only ever held briefly, so status reads never wait
+        # behind long-running work
+        self._write_lock = threading.RLock()
+        # Serializes rollbacks, which run for a long time without holding the write lock
+        self._rollback_lock = threading.Lock()
+        
+        # Each package ecosystem and homeserver.json is a shared resource; serialize per resource
+        # so one tab's pip install can overlap another tab's npm install
+        self._package_locks = {
+            "pip": threading.Lock(),
+            "npm": threading.Lock(),
+            "system": threading.Lock()
+        }
+        self._config_lock = threading.Lock()
+        
+        # Stop invoking build/restart once they keep failing instead of paying for every tab
+        self._build_breaker = _CircuitBreaker("frontend rebuild")
+        self._restart_breaker = _CircuitBreaker("service restart")
     
     def _initialize_batch_managers(self, logger=None) -> BatchInstallationState:
         """Initialize all utility managers for batch operations."""
@@ -83,7 +261,7 @@ class BatchManager:
         state = BatchInstallationState(tabs_to_install=[])
         
         # Initialize managers with the provided logger
-        state.file_operations = FileOperationsManager(manager_logger)
+        state.file_operations = FileOperationsManager(manager_logger, state.created_dirs)
         state.package_manager = PackageManager(manager_logger, self.venv_path, self.package_json_path)
         state.config_manager = ConfigManager(manager_logger, self.homeserver_config_path)
         state.service_manager = ServiceManager(manager_logger)
@@ -91,12 +269,116 @@ class BatchManager:
         state.validation_manager = ValidationManager(manager_logger)
         state.version_checker = SemanticVersionChecker(manager_logger)
         
+        # Load persisted tab checksums once per batch
+        state.tab_checksums = self._load_tab_checksums()
+        
         return state
     
+    def _load_tab_checksums(self) -> Dict[str, Dict[str, Any]]:
+        """Load the persisted tab checksum cache, returning an empty cache on any error."""
+        try:
+            with open(self.checksum_cache_path, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def _save_tab_checksums(self, logger: logging.Logger) -> None:
+        """Atomically persist the tab checksum cache."""
+        try:
+            payload = json.dumps(self.batch_state.tab_checksums, indent=2, sort_keys=True).encode('utf-8')
+            _atomic_write(self.checksum_cache_path, payload)
+        except OSError as e:
+            logger.warning(f"Could not save tab checksum cache: {str(e)}")
+    
+    def _scan_tab_files(self, tab_path: str) -> List[Tuple[str, os.stat_result]]:
+        """Return (relative path, stat) for every regular file under a tab, in stable order."""
+        files = []
+        pending_dirs = [tab_path]
+        while pending_dirs:
+            with os.scandir(pending_dirs.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending_dirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        files.append((os.path.relpath(entry.path, tab_path), entry.stat(follow_symlinks=False)))
+        files.sort(key=lambda item: item[0])
+        return files
+    
+    def _tab_content_hash(self, tab_path: str, files: List[Tuple[str, os.stat_result]]) -> str:
+        """Hash relative paths and contents of a tab's files into a single SHA256 digest."""
+        digest = hashlib.sha256()
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        for rel_path, _ in files:
+            digest.update(rel_path.encode('utf-8') + b"\0")
+            with open(os.path.join(tab_path, rel_path), 'rb') as f:
+                while True:
+                    size = f.readinto(buffer)
+                    if not size:
+                        break
+                    digest.update(view[:size])
+        return digest.hexdigest()
+    
+    def _tab_fingerprint(self, tab_name: str, tab_path: str) -> Optional[Dict[str, Any]]:
+        """Fingerprint a tab's source tree, reusing the cached hash when mtimes are unchanged."""
+        fingerprint = self.batch_state.tab_fingerprints.get(tab_name)
+        if fingerprint:
+            return fingerprint
+        
+        try:
+            files = self._scan_tab_files(tab_path)
+            mtime = max((stat.st_mtime_ns for _, stat in files), default=0)
+            cached = self.batch_state.tab_checksums.get(tab_name)
+            if cached and cached.get("mtime") == mtime and cached.get("files") == len(files):
+                fingerprint = cached
+            else:
+                fingerprint = {
+                    "hash": self._tab_content_hash(tab_path, files),
+                    "mtime": mtime,
+                    "files": len(files)
+                }
+        except OSError:
+            return None
+        
+        self.batch_state.tab_fingerprints[tab_name] = fingerprint
+        return fingerprint
+    
+    def _tab_unchanged(self, tab_name: str, tab_path: str) -> bool:
+        """Check whether a tab's source matches its last successfully installed checksum."""
+        cached = self.batch_state.tab_checksums.get(tab_name)
+        if not cached:
+            return False
+        fingerprint = self._tab_fingerprint(tab_name, tab_path)
+        return fingerprint is not None and fingerprint.get("hash") == cached.get("hash")
+    
+    def _record_tab_checksums(self, tab_names: List[str], logger: logging.Logger) -> None:
+        """Persist checksums for tabs whose build and service restart both succeeded."""
+        updated = False
+        for tab_name in tab_names:
+            fingerprint = self.batch_state.tab_fingerprints.get(tab_name)
+            if not fingerprint:
+                tab_path = self._find_tab_path(tab_name)
+                fingerprint = self._tab_fingerprint(tab_name, tab_path) if tab_path else None
+            if fingerprint:
+                self.batch_state.tab_checksums[tab_name] = fingerprint
+                updated = True
+        if updated:
+            self._save_tab_checksums(logger)
+    
+    def _find_tab_path(self, tab_name: str) -> Optional[str]:
+        """Find the requested path for a tab name within the current batch."""
+        paths_by_name = self.batch_state.tab_paths_by_name
+        if not paths_by_name:
+            for path in self.batch_state.tabs_to_install:
+                # First occurrence wins, matching the order tabs were requested in
+                paths_by_name.setdefault(os.path.basename(path), path)
+        return paths_by_name.get(tab_name)
+    
     def install_premium_tabs_batch(self, tab_paths: List[str], 
                                  defer_build: bool = True,
                                  defer_service_restart: bool = True,
-                                 logger=None) -> Tuple[bool, Dict[str, Any]]:
+                                 logger=None) -> Tuple[bool, Mapping[str, Any]]:
         """Install multiple premium tabs with deferred build/service restart operations."""
         # Get category logger for batch install operations
         category_logger = logger or self.logger
@@ -108,6 +390,8 @@ class BatchManager:
         self.batch_state = self._initialize_batch_managers(category_logger)
         self.batch_state.tabs_to_install = tab_paths
         self.batch_state.batch_start_time = datetime.now()
+        self.batch_state.batch_start_monotonic = time.monotonic()
+        self._last_status_dict = None
         
         try:
             # Phase 1: Individual tab installation (deferring build/service restart)
@@ -121,21 +405,21 @@ class BatchManager:
                     # Validate tab before installation and get resolved path
                     resolved_path = self._validate_tab_for_installation(tab_path, category_logger)
                     if not resolved_path:
-                        self.batch_state.failed_tabs.append(tab_name)
+                        self._record_tab(self.batch_state.failed_tabs, tab_name)
                         category_logger.error(f"Validation failed for tab: {tab_name}")
                         continue
                     
                     # Install tab (without build/service restart) using resolved path
                     if self._install_single_tab_deferred(resolved_path, category_logger):
-                        self.batch_state.installed_tabs.append(tab_name)
+                        self._record_tab(self.batch_state.installed_tabs, tab_name)
                         category_logger.info(f"✅ Successfully installed tab: {tab_name}")
                     else:
-                        self.batch_state.failed_tabs.append(tab_name)
+                        self._record_tab(self.batch_state.failed_tabs, tab_name)
                         category_logger.error(f"❌ Failed to install tab: {tab_name}")
                         
                 except Exception as e:
-                    self.batch_state.failed_tabs.append(tab_name)
-                    category_logger.error(f"❌ Exception during installation of {tab_name}: {str(e)}")
+                    self._record_tab(self.batch_state.failed_tabs, tab_name)
+                    category_logger.exception("❌ Exception during installation of %s: %s", tab_name, e)
             
             # Check if we have enough successful installations to proceed
             success_rate = len(self.batch_state.installed_tabs) / len(tab_paths)
@@ -152,7 +436,8 @@ class BatchManager:
                 # Frontend rebuild
                 if defer_build and self.batch_state.installed_tabs:
                     category_logger.info("Performing deferred frontend rebuild")
-                    if not self.batch_state.build_manager.rebuild_frontend():
+                    if not self._build_breaker.call(self._retry_with_backoff, "rebuild_frontend",
+                                                    self.batch_state.build_manager.rebuild_frontend, category_logger):
                         category_logger.error("Deferred frontend rebuild failed")
                         # Fall back to individual installation
                         return self._fallback_to_individual_installation(category_logger)
@@ -162,20 +447,28 @@ class BatchManager:
                 # Service restart
                 if defer_service_restart and self.batch_state.installed_tabs:
                     category_logger.info("Performing deferred service restart")
-                    if not self.batch_state.service_manager.restart_homeserver_services():
+                    self._register_rollback(self.batch_state.service_manager.rollback_service_states)
+                    if not self._restart_breaker.call(self._retry_with_backoff, "restart_homeserver_services",
+                                                      self.batch_state.service_manager.restart_homeserver_services,
+                                                      category_logger):
                         category_logger.error("Deferred service restart failed")
                         # Fall back to individual installation
                         return self._fallback_to_individual_installation(category_logger)
                     else:
                         category_logger.info("✅ Deferred service restart completed")
             
+            # Only tabs that went through both a rebuild and a restart are known-good
+            if defer_build and defer_service_restart:
+                self._record_tab_checksums(self.batch_state.installed_tabs, category_logger)
+            
             # Success!
             self.batch_state.batch_end_time = datetime.now()
+            self.batch_state.batch_end_monotonic = time.monotonic()
             category_logger.info("=== BATCH INSTALLATION COMPLETED SUCCESSFULLY ===")
-            category_logger.info(f"Successfully installed: {', '.join(self.batch_state.installed_tabs)}")
+            category_logger.info("Successfully installed: %s", _LazyJoin(self.batch_state.installed_tabs))
             
             if self.batch_state.failed_tabs:
-                category_logger.warning(f"Some tabs failed: {', '.join(self.batch_state.failed_tabs)}")
+                category_logger.warning("Some tabs failed: %s", _LazyJoin(self.batch_state.failed_tabs))
             
             return True, self._get_batch_status()
             
@@ -220,31 +513,30 @@ class BatchManager:
             return None
     
     def _install_single_tab_deferred(self, tab_path: str, logger: logging.Logger) -> bool:
-        """Install a single tab without build/service restart operations."""
-        try:
-            tab_name = os.path.basename(tab_path)
-            
-            # File operations
-            if not self._perform_file_operations(tab_path, logger):
-                return False
-            
-            # Package installations
-            if not self._perform_package_installations(tab_path, logger):
-                return False
-            
-            # Configuration patches
-            if not self._perform_config_patches(tab_path, logger):
-                return False
-            
-            logger.info(f"Tab {tab_name} installation completed successfully")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Installation failed for {tab_path}: {str(e)}")
+        """Install a single tab without build/service restart operations.
+        
+        Exceptions propagate to the batch loop, which is the single place failures are recorded.
+        """
+        tab_name = os.path.basename(tab_path)
+        
+        # File operations
+        if not self._perform_file_operations(tab_path, logger):
             return False
+        
+        # Package installations
+        if not self._perform_package_installations(tab_path, logger):
+            return False
+        
+        # Configuration patches
+        if not self._perform_config_patches(tab_path, logger):
+            return False
+        
+        logger.info(f"Tab {tab_name} installation completed successfully")
+        return True
     
     def _perform_file_operations(self, tab_path: str, logger: logging.Logger) -> bool:
         """Perform file operations for a tab using the FileOperationsManager."""
+        self._register_rollback(self.batch_state.file_operations.rollback_operations)
         try:
             # Load root manifest for complete file operations
             root_index = os.path.join(tab_path, "index.json")
@@ -472,13 +764,16 @@ class BatchManager:
     
     def _perform_package_installations(self, tab_path: str, logger: logging.Logger) -> bool:
         """Perform package installations for a tab."""
+        self._register_rollback(self.batch_state.package_manager.rollback_package_installations)
         try:
             # Check for Python requirements
             requirements_file = os.path.join(tab_path, "backend", "requirements.txt")
             if os.path.exists(requirements_file):
                 logger.info(f"Installing Python requirements from: {requirements_file}")
                 # Integrate with actual package manager
-                if not self.batch_state.package_manager.install_python_requirements(requirements_file):
+                with self._package_locks["pip"]:
+                    installed = self.batch_state.package_manager.install_python_requirements(requirements_file)
+                if not installed:
                     logger.error(f"Failed to install Python requirements from {requirements_file}")
                     return False
                 logger.info("Python requirements installed successfully")
@@ -488,7 +783,9 @@ class BatchManager:
             if os.path.exists(package_patch):
                 logger.info(f"Found NPM package patch: {package_patch}")
                 # Integrate with actual package manager
-                if not self.batch_state.package_manager.apply_npm_patch(package_patch):
+                with self._package_locks["npm"]:
+                    applied = self.batch_state.package_manager.apply_npm_patch(package_patch)
+                if not applied:
                     logger.error(f"Failed to apply NPM package patch {package_patch}")
                     return False
                 logger.info("NPM package patch applied successfully")
@@ -498,7 +795,9 @@ class BatchManager:
             if os.path.exists(dependencies_file):
                 logger.info(f"Found system dependencies: {dependencies_file}")
                 # Integrate with actual package manager
-                if not self.batch_state.package_manager.install_system_dependencies(dependencies_file):
+                with self._package_locks["system"]:
+                    installed = self.batch_state.package_manager.install_system_dependencies(dependencies_file)
+                if not installed:
                     logger.error(f"Failed to install system dependencies from {dependencies_file}")
                     return False
                 logger.info("System dependencies installed successfully")
@@ -511,6 +810,7 @@ class BatchManager:
     
     def _perform_config_patches(self, tab_path: str, logger: logging.Logger) -> bool:
         """Perform configuration patches for a tab."""
+        self._register_rollback(self.batch_state.config_manager.rollback_config)
         try:
             # Check for homeserver config patch
             config_patch = os.path.join(tab_path, "homeserver.patch.json")
@@ -528,7 +828,12 @@ class BatchManager:
             logger.error(f"Config patch failed: {str(e)}")
             return False
     
-    def _fallback_to_individual_installation(self, logger: logging.Logger) -> Tuple[bool, Dict[str, Any]]:
+    def _perform_locked_config_patches(self, tab_path: str, logger: logging.Logger) -> bool:
+        """Perform configuration patches while holding the homeserver.json lock."""
+        with self._config_lock:
+            return self._perform_config_patches(tab_path, logger)
+    
+    def _fallback_to_individual_installation(self, logger: logging.Logger) -> Tuple[bool, Mapping[str, Any]]:
         """Fall back to individual installation when batch operations fail."""
         logger.warning("=== FALLBACK TO INDIVIDUAL INSTALLATION ===")
         logger.warning("Batch installation failed, attempting individual installation for working tabs")
@@ -539,6 +844,11 @@ class BatchManager:
         
         self.batch_state.fallback_attempted = True
         
+        # The fallback finalizes a different set of tabs; failures of the Phase 2 attempt
+        # that sent us here must not open the circuit on its first try
+        self._build_breaker.reset()
+        self._restart_breaker.reset()
+        
         # Get the list of tabs that were successfully installed
         working_tabs = self.batch_state.installed_tabs.copy()
         
@@ -548,117 +858,271 @@ class BatchManager:
         
         logger.info(f"Attempting individual installation for {len(working_tabs)} working tabs")
         
-        # Try to reinstall each working tab individually
+        # Resolve paths and drop unchanged tabs before fanning out
+        pending_tabs: List[_PendingTab] = []
         for tab_name in working_tabs:
-            logger.info(f"Reinstalling tab individually: {tab_name}")
+            tab_path = self._find_tab_path(tab_name)
+            
+            if not tab_path:
+                logger.error(f"Could not find path for tab: {tab_name}")
+                self._record_tab(self.batch_state.individual_failures, tab_name)
+                continue
             
+            # Skip tabs whose source is unchanged since their last successful install
+            if self._tab_unchanged(tab_name, tab_path):
+                self._record_tab(self.batch_state.skipped_tabs, tab_name)
+                logger.info(f"Tab unchanged since last successful install, skipping: {tab_name}")
+                continue
+            
+            pending_tabs.append(_PendingTab(tab_path, tab_name))
+        
+        # Prepare tabs concurrently; build and restart are coalesced below
+        prepare_results: Dict[str, bool] = {}
+        if pending_tabs:
+            prepare_results = _run_coroutine(self._prepare_tabs_concurrently(pending_tabs, logger))
+        
+        # Record outcomes in the original tab order
+        prepared_tabs: List[str] = []
+        for tab in pending_tabs:
+            tab_name = tab.name
+            if prepare_results.get(tab_name):
+                prepared_tabs.append(tab_name)
+            else:
+                self._record_tab(self.batch_state.individual_failures, tab_name)
+                logger.error("❌ Individual installation failed: %s", tab_name)
+        
+        # Single frontend rebuild and service restart for every prepared tab
+        if prepared_tabs:
             try:
-                # Find the tab path
-                tab_path = None
-                for path in self.batch_state.tabs_to_install:
-                    if os.path.basename(path) == tab_name:
-                        tab_path = path
-                        break
-                
-                if not tab_path:
-                    logger.error(f"Could not find path for tab: {tab_name}")
-                    self.batch_state.individual_failures.append(tab_name)
-                    continue
-                
-                # Perform individual installation with immediate build/service restart
-                if self._install_single_tab_immediate(tab_path, logger):
-                    self.batch_state.individual_successes.append(tab_name)
-                    logger.info(f"✅ Individual installation successful: {tab_name}")
+                if self._finalize_batch(prepared_tabs, logger):
+                    for tab_name in prepared_tabs:
+                        self._record_tab(self.batch_state.individual_successes, tab_name)
+                        logger.debug("Individual installation successful: %s", tab_name)
+                    self._record_tab_checksums(prepared_tabs, logger)
                 else:
-                    self.batch_state.individual_failures.append(tab_name)
-                    logger.error(f"❌ Individual installation failed: {tab_name}")
-                    
-            except Exception as e:
-                self.batch_state.individual_failures.append(tab_name)
-                logger.error(f"❌ Exception during individual installation of {tab_name}: {str(e)}")
+                    # Every prepared tab is on disk together, so the shared build or restart
+                    # cannot be pinned on any one of them; the whole set fails
+                    logger.error("Frontend rebuild or service restart failed for the prepared tabs: %s",
+                                 _LazyJoin(prepared_tabs))
+                    for tab_name in prepared_tabs:
+                        self._record_tab(self.batch_state.individual_failures, tab_name)
+            except CircuitOpenError as e:
+                logger.error("%s; not finalizing prepared tabs: %s", e, _LazyJoin(prepared_tabs))
+                for tab_name in prepared_tabs:
+                    self._record_tab(self.batch_state.individual_failures, tab_name)
         
-        # Final status
-        final_success = len(self.batch_state.individual_successes) > 0
+        # Final status; skipped tabs don't count, since the rebuild or restart that sent
+        # us here failed and was never retried for them
+        state = self.batch_state
+        final_success = len(state.individual_successes) > 0
         
         if final_success:
+            state.fallback_outcome = "succeeded"
             logger.info("=== FALLBACK INSTALLATION COMPLETED ===")
-            logger.info(f"Successfully installed individually: {', '.join(self.batch_state.individual_successes)}")
+            logger.info("Successfully installed individually: %s", _LazyJoin(state.individual_successes))
+            
+            if state.skipped_tabs:
+                logger.info("Skipped unchanged tabs: %s", _LazyJoin(state.skipped_tabs))
             
-            if self.batch_state.individual_failures:
-                logger.warning(f"Some tabs failed individual installation: {', '.join(self.batch_state.individual_failures)}")
+            if state.individual_failures:
+                logger.warning("Some tabs failed individual installation: %s",
+                               _LazyJoin(state.individual_failures))
+        elif not state.individual_failures:
+            # Nothing failed here, but nothing was rebuilt or restarted either
+            state.fallback_outcome = "skipped"
+            logger.warning("=== FALLBACK INSTALLATION SKIPPED ===")
+            logger.warning("Every working tab is unchanged since its last successful install, "
+                           "so none was reinstalled and the failed rebuild or restart was not retried: %s",
+                           _LazyJoin(state.skipped_tabs))
         else:
+            state.fallback_outcome = "failed"
             logger.error("=== FALLBACK INSTALLATION FAILED ===")
-            logger.error("All tabs failed individual installation")
+            logger.error("Tabs failed individual installation: %s", _LazyJoin(state.individual_failures))
+            
+            if state.skipped_tabs:
+                logger.info("Skipped unchanged tabs: %s", _LazyJoin(state.skipped_tabs))
         
         return final_success, self._get_batch_status()
     
-    def _install_single_tab_immediate(self, tab_path: str, logger: logging.Logger) -> bool:
-        """Install a single tab with immediate build/service restart."""
+    def _prepare_stages(self) -> Tuple[Tuple[str, Callable[[str, logging.Logger], bool]], ...]:
+        """Ordered prepare stages; each stage takes a tab once the previous stage is done with it."""
+        return (
+            ("files", self._perform_file_operations),
+            ("packages", self._perform_package_installations),
+            ("config", self._perform_locked_config_patches),
+        )
+    
+    async def _prepare_tabs_concurrently(self, pending_tabs: List[_PendingTab],
+                                         logger: logging.Logger) -> Dict[str, bool]:
+        """Pipeline tabs through the prepare stages and reap results as they complete.
+        
+        Every stage has its own capacity, so while one tab installs packages the next
+        tab can already be copying files. Tabs waiting for a stage hold no worker thread.
+        """
+        stage_slots = {name: asyncio.Semaphore(capacity) for name, capacity in PREPARE_STAGE_CAPACITY.items()}
+        stages = self._prepare_stages()
+        
+        async def prepare(tab: _PendingTab) -> bool:
+            logger.info(f"Reinstalling tab individually: {tab.name}")
+            for stage_name, stage in stages:
+                async with stage_slots[stage_name]:
+                    if not await asyncio.to_thread(stage, tab.path, logger):
+                        return False
+            logger.info(f"Individual preparation completed successfully for {tab.name}")
+            return True
+        
+        results = await asyncio.gather(
+            *(prepare(tab) for tab in pending_tabs),
+            return_exceptions=True
+        )
+        
+        prepare_results: Dict[str, bool] = {}
+        for tab, result in zip(pending_tabs, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Exception during individual installation of {tab.name}: {str(result)}")
+                prepare_results[tab.name] = False
+            else:
+                prepare_results[tab.name] = result
+        return prepare_results
+    
+    def _finalize_batch(self, successful_tabs: List[str], logger: logging.Logger) -> bool:
+        """Rebuild the frontend and restart services once for a set of prepared tabs.
+        
+        Raises CircuitOpenError when build or restart has been failing repeatedly.
+        """
+        self._register_rollback(self.batch_state.service_manager.rollback_service_states)
+        tab_list = _LazyJoin(successful_tabs)
         try:
-            tab_name = os.path.basename(tab_path)
-            
-            # File operations
-            if not self._perform_file_operations(tab_path, logger):
+            logger.info("Rebuilding frontend for %s", tab_list)
+            if not self._build_breaker.call(self._retry_with_backoff, "rebuild_frontend",
+                                            self.batch_state.build_manager.rebuild_frontend, logger):
+                logger.error("Frontend rebuild failed for %s", tab_list)
                 return False
             
-            # Package installations
-            if not self._perform_package_installations(tab_path, logger):
+            logger.info("Restarting services for %s", tab_list)
+            if not self._restart_breaker.call(self._retry_with_backoff, "restart_homeserver_services",
+                                              self.batch_state.service_manager.restart_homeserver_services, logger):
+                logger.error("Service restart failed for %s", tab_list)
                 return False
             
-            # Configuration patches
-            if not self._perform_config_patches(tab_path, logger):
-                return False
-            
-            # Immediate frontend rebuild
-            logger.info(f"Rebuilding frontend for {tab_name}")
-            if not self.batch_state.build_manager.rebuild_frontend():
-                logger.error(f"Frontend rebuild failed for {tab_name}")
-                return False
-            
-            # Immediate service restart
-            logger.info(f"Restarting services for {tab_name}")
-            if not self.batch_state.service_manager.restart_homeserver_services():
-                logger.error(f"Service restart failed for {tab_name}")
-                return False
-            
-            logger.info(f"Individual installation completed successfully for {tab_name}")
             return True
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
-            logger.error(f"Individual installation failed for {tab_path}: {str(e)}")
+            logger.error("Finalization failed for %s: %s", tab_list, e)
             return False
     
-    def _get_batch_status(self) -> Dict[str, Any]:
-        """Get comprehensive batch installation status."""
-        if not self.batch_state:
-            return {
+    def _retry_with_backoff(self, op_name: str, fn: Callable[[], bool], logger: logging.Logger,
+                            attempts: int = RETRY_ATTEMPTS, base: float = RETRY_BASE_DELAY,
+                            cap: float = RETRY_MAX_DELAY) -> bool:
+        """Run an idempotent operation, retrying failures with full-jitter exponential backoff.
+        
+        Only safe for operations that can be repeated without side effects accumulating,
+        such as a frontend rebuild or a service restart.
+        """
+        for attempt in range(attempts):
+            try:
+                if fn():
+                    return True
+                logger.warning(f"{op_name} failed (attempt {attempt + 1}/{attempts})")
+            except Exception as e:
+                logger.warning(f"{op_name} raised (attempt {attempt + 1}/{attempts}): {str(e)}")
+            
+            if attempt + 1 < attempts:
+                with self._write_lock:
+                    self.batch_state.retry_counts[op_name] = self.batch_state.retry_counts.get(op_name, 0) + 1
+                time.sleep(random.uniform(0, min(cap, base * 2 ** attempt)))
+        
+        return False
+    
+    def _rollback_order(self, state: BatchInstallationState) -> List[Callable[[], None]]:
+        """Registered rollback handles in the order they must run: config, packages, files, services."""
+        ordered = [
+            state.config_manager.rollback_config,
+            state.package_manager.rollback_package_installations,
+            state.file_operations.rollback_operations,
+            state.service_manager.rollback_service_states,
+        ]
+        return [rollback for rollback in ordered if rollback in state.rollback_stack]
+    
+    def _register_rollback(self, rollback: Callable[[], None]) -> None:
+        """Register a manager's rollback handle once, before its forward step can mutate anything."""
+        with self._write_lock:
+            if rollback not in self.batch_state.rollback_stack:
+                self.batch_state.rollback_stack.append(rollback)
+    
+    def _record_tab(self, bucket, tab_name: str) -> None:
+        """Record a tab in one of the batch state's outcome collections under the write lock."""
+        with self._write_lock:
+            if isinstance(bucket, dict):
+                bucket[tab_name] = None
+            else:
+                bucket.append(tab_name)
+    
+    def _snapshot_batch_state(self) -> Optional[BatchInstallationState]:
+        """Copy the batch state's collections under the write lock for lock-free reading."""
+        with self._write_lock:
+            state = self.batch_state
+            if state is None:
+                return None
+            return replace(
+                state,
+                tabs_to_install=list(state.tabs_to_install),
+                installed_tabs=list(state.installed_tabs),
+                failed_tabs=list(state.failed_tabs),
+                skipped_tabs=list(state.skipped_tabs),
+                deferred_builds=list(state.deferred_builds),
+                deferred_service_restarts=list(state.deferred_service_restarts),
+                individual_successes=dict(state.individual_successes),
+                individual_failures=dict(state.individual_failures),
+                retry_counts=dict(state.retry_counts)
+            )
+    
+    def _get_batch_status(self) -> Mapping[str, Any]:
+        """Get comprehensive batch installation status as a read-only mapping."""
+        cached = self._last_status_dict
+        if cached is not None:
+            return cached
+        
+        state = self._snapshot_batch_state()
+        if not state:
+            return types.MappingProxyType({
                 "status": "no_batch_operation",
                 "message": "No batch installation has been performed"
-            }
+            })
         
-        # Calculate duration
+        # Calculate duration on the monotonic clock so wall-clock steps don't skew it
         duration = None
-        if self.batch_state.batch_start_time:
-            if self.batch_state.batch_end_time:
-                duration = (self.batch_state.batch_end_time - self.batch_state.batch_start_time).total_seconds()
+        if state.batch_start_monotonic is not None:
+            if state.batch_end_monotonic is not None:
+                duration = state.batch_end_monotonic - state.batch_start_monotonic
             else:
-                duration = (datetime.now() - self.batch_state.batch_start_time).total_seconds()
-        
-        return {
-            "status": "batch_completed" if self.batch_state.batch_end_time else "batch_in_progress",
-            "total_tabs": len(self.batch_state.tabs_to_install),
-            "successful_installations": len(self.batch_state.installed_tabs),
-            "failed_installations": len(self.batch_state.failed_tabs),
-            "successful_tabs": self.batch_state.installed_tabs,
-            "failed_tabs": self.batch_state.failed_tabs,
-            "skipped_tabs": self.batch_state.skipped_tabs,
-            "fallback_attempted": self.batch_state.fallback_attempted,
-            "individual_successes": self.batch_state.individual_successes,
-            "individual_failures": self.batch_state.individual_failures,
+                duration = time.monotonic() - state.batch_start_monotonic
+        
+        installed_tabs = state.installed_tabs
+        failed_tabs = state.failed_tabs
+        status = types.MappingProxyType({
+            "status": "batch_completed" if state.batch_end_time else "batch_in_progress",
+            "total_tabs": len(state.tabs_to_install),
+            "successful_installations": len(installed_tabs),
+            "failed_installations": len(failed_tabs),
+            "successful_tabs": installed_tabs,
+            "failed_tabs": failed_tabs,
+            "skipped_tabs": state.skipped_tabs,
+            "fallback_attempted": state.fallback_attempted,
+            "fallback_outcome": state.fallback_outcome,
+            "individual_successes": list(state.individual_successes),
+            "individual_failures": list(state.individual_failures),
             "batch_duration_seconds": duration,
-            "deferred_builds": self.batch_state.deferred_builds,
-            "deferred_service_restarts": self.batch_state.deferred_service_restarts
-        }
+            "deferred_builds": state.deferred_builds,
+            "deferred_service_restarts": state.deferred_service_restarts,
+            "retry_counts": state.retry_counts
+        })
+        
+        if state.batch_end_time:
+            self._last_status_dict = status
+        return status
     
     def rollback_batch_installation(self, logger=None) -> bool:
         """Rollback the entire batch installation."""
@@ -670,26 +1134,34 @@ class BatchManager:
         
         category_logger.info("=== ROLLING BACK BATCH INSTALLATION ===")
         
-        try:
-            # Rollback in reverse order of operations
-            if self.batch_state.config_manager:
-                self.batch_state.config_manager.rollback_config()
-            
-            if self.batch_state.package_manager:
-                self.batch_state.package_manager.rollback_package_installations()
-            
-            if self.batch_state.file_operations:
-                self.batch_state.file_operations.rollback_operations()
+        with self._rollback_lock:
+            # Take what to undo under the write lock, then release it so status
+            # reads can snapshot the state while the rollback steps run
+            with self._write_lock:
+                state = self.batch_state
+                if state is None:
+                    category_logger.warning("No batch installation to rollback")
+                    return True
+                rollbacks = self._rollback_order(state)
             
-            if self.batch_state.service_manager:
-                self.batch_state.service_manager.rollback_service_states()
-            
-            category_logger.info("Batch installation rollback completed")
-            return True
-            
-        except Exception as e:
-            category_logger.error(f"Batch rollback failed: {str(e)}")
-            return False
-        finally:
-            # Clear batch state
-            self.batch_state = None
\ No newline at end of file
+            try:
+                # Rollback in reverse order of operations, continuing past failures
+                success = True
+                for rollback in rollbacks:
+                    try:
+                        rollback()
+                    except Exception as e:
+                        success = False
+                        category_logger.error(f"Rollback step {rollback.__qualname__} failed: {str(e)}")
+                
+                if success:
+                    category_logger.info("Batch installation rollback completed")
+                else:
+                    category_logger.error("Batch rollback completed with errors")
+                return success
+            finally:
+                # Clear batch state
+                with self._write_lock:
+                    if self.batch_state is state:
+                        self.batch_state = None
+                        self._last_status_dict = None
\ No newline at end of file
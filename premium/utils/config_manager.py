@@ -7,11 +7,143 @@ Provides atomic configuration operations with rollback capabilities.
 """
 
 import os
+import copy
+import errno
+import pwd
+import grp
 import json
+import fcntl
 import subprocess
 import shutil
-from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime
+import tempfile
+import time
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from pystemd.systemd1 import Manager as SystemdManager
+except ImportError:
+    SystemdManager = None
+
+# Seconds to wait for a systemd job queued over D-Bus to finish
+SYSTEMD_JOB_TIMEOUT = 90.0
+
+# Lock file serializing config-mutating transactions across installer processes
+CONFIG_LOCK_PATH = "/run/homeserver-premium.lock"
+
+# Per lock path, shared by every ConfigManager in the process: an RLock serializing
+# threads, plus the flock fd and re-entry depth of the thread holding it. flock is
+# per open file description, so the process must take it once, not once per manager.
+_process_config_locks: Dict[str, Dict[str, Any]] = {}
+_process_config_locks_guard = threading.Lock()
+
+# Lines of build command output kept in memory for error reporting
+BUILD_OUTPUT_TAIL_LINES = 50
+
+
+def _read_all(path: str) -> bytes:
+    """Read a whole file with a single sized os.read, looping only on short reads."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        chunks = [os.read(fd, size or 65536)]
+        while chunks[-1]:
+            chunks.append(os.read(fd, 65536))
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=128)
+def _split_key_path(key_path: str) -> Tuple[str, ...]:
+    """Split a dotted config key path once; repeated lookups reuse the tuple."""
+    return tuple(key_path.split('.'))
+
+
+def _remove_tree(path: str) -> None:
+    """Delete a directory tree using scandir's cached entry types (symlinks are unlinked, not followed)."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _remove_tree(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to indent=2 JSON bytes, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+def _run_command(logger, cmd: List[str], *, check: bool = True, capture_output: bool = True,
+                 cwd: Optional[str] = None, tee: Optional[Callable[[str], None]] = None) -> subprocess.CompletedProcess:
+    """
+    Run a command with logging; shared by the config, service and build managers.
+    
+    With tee, combined stdout/stderr is streamed line by line to tee as it is
+    produced and only the last BUILD_OUTPUT_TAIL_LINES lines are kept in memory.
+    """
+    cmd_str = ' '.join(cmd)
+    if cwd:
+        logger.debug(f"Running command in {cwd}: {cmd_str}")
+    else:
+        logger.debug(f"Running command: {cmd_str}")
+    try:
+        if tee is None or not capture_output:
+            result = subprocess.run(cmd, check=check, capture_output=capture_output, text=True, cwd=cwd)
+            if result.stdout:
+                logger.debug(f"Command output: {result.stdout.strip()}")
+            return result
+        
+        tail = deque(maxlen=BUILD_OUTPUT_TAIL_LINES)
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              bufsize=1, text=True, cwd=cwd) as proc:
+            for line in proc.stdout:
+                line = line.rstrip()
+                tail.append(line)
+                logger.debug(line)
+                tee(line)
+            returncode = proc.wait()
+        
+        output = '\n'.join(tail)
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd, output=output)
+        return subprocess.CompletedProcess(cmd, returncode, stdout=output)
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Command failed: {cmd_str}")
+        logger.error(f"Error: {e.stderr if e.stderr else (e.output or str(e))}")
+        raise
+
+
+class ConfigTransactionError(Exception):
+    """Raised when a config transaction fails to validate or write on commit."""
+
+
+def _holds_config_lock(method):
+    """Run a ConfigManager method while holding the config lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._config_lock():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class ConfigManager:
@@ -19,35 +151,83 @@ class ConfigManager:
     
     def __init__(self, logger, 
                  homeserver_config_path: str = "/var/www/homeserver/src/config/homeserver.json",
-                 factory_fallback_script: str = "/usr/local/sbin/factoryFallback.sh"):
+                 factory_fallback_script: str = "/usr/local/sbin/factoryFallback.sh",
+                 lock_path: str = CONFIG_LOCK_PATH):
         self.logger = logger
         self.homeserver_config_path = homeserver_config_path
         self.factory_fallback_script = factory_fallback_script
+        self.lock_path = lock_path
         self.config_backup: Optional[str] = None
+        self._www_uid, self._www_gid = self._resolve_www_ids()
+        # (stat signature, parsed config, raw bytes) of the live config, reparsed only when the file changes
+        self._config_cache: Optional[Tuple[Tuple[int, int, int], dict, bytes]] = None
+        # In-memory config owned by an open transaction(); None outside one
+        self._txn_config: Optional[dict] = None
+        self._txn_dirty = False
+    
+    def _resolve_www_ids(self) -> Tuple[int, int]:
+        """Resolve the www-data uid/gid once; -1 leaves ownership unchanged."""
+        try:
+            uid = pwd.getpwnam('www-data').pw_uid
+        except KeyError:
+            self.logger.warning("User 'www-data' not found; config ownership will not be changed")
+            uid = -1
+        try:
+            gid = grp.getgrnam('www-data').gr_gid
+        except KeyError:
+            self.logger.warning("Group 'www-data' not found; config group will not be changed")
+            gid = -1
+        return uid, gid
+    
+    @contextmanager
+    def _config_lock(self):
+        """
+        Hold an exclusive flock on the config lock file for one transaction.
+        
+        Threads and ConfigManager instances in this process queue on a process-wide
+        RLock for the same lock path; re-entry by the holding thread, through any
+        instance, nests without taking the flock again, so locked methods may call
+        each other. If the lock file cannot be opened the transaction proceeds unlocked.
+        """
+        with _process_config_locks_guard:
+            entry = _process_config_locks.setdefault(
+                self.lock_path, {"rlock": threading.RLock(), "fd": None, "depth": 0}
+            )
+        
+        with entry["rlock"]:
+            if entry["depth"] == 0:
+                fd = None
+                try:
+                    fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                except OSError as e:
+                    self.logger.warning(f"Unable to lock {self.lock_path}, continuing without lock: {str(e)}")
+                    if fd is not None:
+                        os.close(fd)
+                        fd = None
+                entry["fd"] = fd
+            
+            entry["depth"] += 1
+            try:
+                yield
+            finally:
+                entry["depth"] -= 1
+                if entry["depth"] == 0 and entry["fd"] is not None:
+                    os.close(entry["fd"])
+                    entry["fd"] = None
     
     def _run_command(self, cmd: List[str], check: bool = True, capture_output: bool = True, cwd: str = None) -> subprocess.CompletedProcess:
         """Run a command with logging."""
-        cmd_str = ' '.join(cmd)
-        if cwd:
-            self.logger.debug(f"Running command in {cwd}: {cmd_str}")
-        else:
-            self.logger.debug(f"Running command: {cmd_str}")
-        try:
-            result = subprocess.run(cmd, check=check, capture_output=capture_output, text=True, cwd=cwd)
-            if result.stdout:
-                self.logger.debug(f"Command output: {result.stdout.strip()}")
-            return result
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"Command failed: {cmd_str}")
-            self.logger.error(f"Error: {e.stderr if e.stderr else str(e)}")
-            raise
+        return _run_command(self.logger, cmd, check=check, capture_output=capture_output, cwd=cwd)
     
     def create_backup(self, file_path: str) -> Optional[str]:
         """Create a backup of a file and return backup path."""
         if not os.path.exists(file_path):
             return None
             
-        backup_path = f"/tmp/{os.path.basename(file_path)}.installer_backup.{int(datetime.now().timestamp())}"
+        backup_path = f"/tmp/{os.path.basename(file_path)}.installer_backup.{time.time_ns()}"
+        # A real copy: backend routes rewrite homeserver.json in place, which would
+        # silently change a hardlinked "backup" along with it
         shutil.copy2(file_path, backup_path)
         self.logger.debug(f"Created backup: {file_path} -> {backup_path}")
         return backup_path
@@ -58,7 +238,11 @@ class ConfigManager:
             return False
             
         try:
-            shutil.copy2(backup_path, target_path)
+            # Copy beside the target, then rename over it: readers never see a partial
+            # file, and the restored config never shares an inode with the backup
+            staged_path = f"{target_path}.installer_restore"
+            shutil.copy2(backup_path, staged_path)
+            os.replace(staged_path, target_path)
             self.logger.debug(f"Restored backup: {backup_path} -> {target_path}")
             # Restore proper permissions after backup restoration
             self._restore_config_permissions(target_path)
@@ -78,9 +262,9 @@ class ConfigManager:
         
         try:
             # Set ownership to www-data:www-data
-            self._run_command(['chown', 'www-data:www-data', target_path])
+            os.chown(target_path, self._www_uid, self._www_gid)
             # Set permissions to 664 (rw-rw-r--)
-            self._run_command(['chmod', '664', target_path])
+            os.chmod(target_path, 0o664)
             self.logger.debug(f"Restored config permissions: {target_path} -> www-data:www-data 664")
             return True
         except Exception as e:
@@ -91,63 +275,150 @@ class ConfigManager:
         """Validate configuration using factoryFallback.sh."""
         try:
             if config_path:
-                # Temporarily move current config and test the new one
+                # Temporarily swap the candidate in and test it. factoryFallback.sh
+                # only inspects the live path, so the original is kept aside as a
+                # hardlink and both moves are renames rather than file copies.
                 temp_backup = f"{self.homeserver_config_path}.installer_temp"
-                if os.path.exists(self.homeserver_config_path):
-                    shutil.copy2(self.homeserver_config_path, temp_backup)
-                shutil.copy2(config_path, self.homeserver_config_path)
+                had_original = self._link_aside(self.homeserver_config_path, temp_backup)
+                candidate = f"{self.homeserver_config_path}.installer_candidate"
+                self._link_aside(config_path, candidate)
+                os.replace(candidate, self.homeserver_config_path)
                 
                 try:
-                    result = self._run_command([self.factory_fallback_script])
-                    valid = not result.stdout.strip().endswith('.factory')
+                    return self._run_factory_fallback()
                 finally:
                     # Restore original config ONLY when testing a new config_path
                     # CRITICAL: Do NOT delete homeserver.json when validating current config
-                    if os.path.exists(temp_backup):
-                        shutil.move(temp_backup, self.homeserver_config_path)
-                    # Note: Removed the elif that was deleting homeserver.json
-                    # If temp_backup doesn't exist but we're in this branch, 
-                    # it means we copied config_path but had no original to backup
-                    # In that case, keep the config_path as the new config
-                
-                return valid
+                    # If there was no original to back up, keep config_path as the new config
+                    if had_original:
+                        os.replace(temp_backup, self.homeserver_config_path)
             else:
                 # Validate current config in-place (no modifications)
-                result = self._run_command([self.factory_fallback_script])
-                return not result.stdout.strip().endswith('.factory')
+                return self._run_factory_fallback()
                 
         except Exception as e:
             self.logger.error(f"Config validation failed: {str(e)}")
             return False
     
+    def _run_factory_fallback(self) -> bool:
+        """Run factoryFallback.sh against the live config path."""
+        result = self._run_command([self.factory_fallback_script])
+        return not result.stdout.strip().endswith('.factory')
+    
+    def _link_aside(self, source_path: str, link_path: str) -> bool:
+        """
+        Hardlink source_path to link_path, copying only across filesystems.
+        
+        Only for holding a file aside while the live path is swapped by rename; an
+        in-place write to the source would show through the link, so it is no backup.
+        """
+        if not os.path.exists(source_path):
+            return False
+        if os.path.lexists(link_path):
+            os.remove(link_path)
+        try:
+            os.link(source_path, link_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.copy2(source_path, link_path)
+        return True
+    
+    def _serialize_config(self, config_data: dict) -> bytes:
+        """Serialize configuration exactly as it is written to disk."""
+        return _json_dumps(config_data)
+    
+    def _write_temp_config(self, config_bytes: bytes) -> str:
+        """Write config_bytes to a new temp file beside the live config and return its path."""
+        live_path = self.homeserver_config_path
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(live_path),
+                                         prefix=f".{os.path.basename(live_path)}.",
+                                         suffix=".temp", delete=False) as f:
+            try:
+                f.write(config_bytes)
+                os.fchmod(f.fileno(), 0o664)
+            except Exception:
+                os.remove(f.name)
+                raise
+        return f.name
+    
+    def _install_validated_config(self, config_bytes: bytes) -> bool:
+        """
+        Write config_bytes over the live config and keep it only if it validates.
+        
+        The bytes are written once to a temp file beside the live config and
+        renamed into place; factoryFallback.sh then checks the live path. On
+        failure the original is renamed back, so no full-file copies are made.
+        """
+        live_path = self.homeserver_config_path
+        saved_path = f"{live_path}.installer_temp"
+        temp_path = None
+        had_original = False
+        installed = False
+        
+        try:
+            temp_path = self._write_temp_config(config_bytes)
+            had_original = self._link_aside(live_path, saved_path)
+            os.replace(temp_path, live_path)
+            temp_path = None
+            installed = True
+            
+            valid = self._run_factory_fallback()
+        except Exception as e:
+            self.logger.error(f"Config validation failed: {str(e)}")
+            valid = False
+        
+        try:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            if valid:
+                if had_original:
+                    os.remove(saved_path)
+            elif had_original:
+                os.replace(saved_path, live_path)
+            elif installed:
+                os.remove(live_path)
+        except Exception as e:
+            self.logger.error(f"Failed to clean up config validation files: {str(e)}")
+        
+        return valid
+    
     def deep_merge(self, target: dict, source: dict) -> None:
         """Deep merge source dict into target dict."""
-        for key, value in source.items():
-            if key in target and isinstance(target[key], dict) and isinstance(value, dict):
-                # Special handling for tabs object to preserve starred position
-                if key == "tabs":
-                    self.deep_merge_tabs(target[key], value)
-                else:
-                    self.deep_merge(target[key], value)
+        # Explicit work stack instead of recursion: (target, source, is_tabs)
+        stack = [(target, source, False)]
+        while stack:
+            current_target, current_source, is_tabs = stack.pop()
+            
+            # Special handling for tabs object to preserve starred position
+            starred_value = current_target.pop("starred", None) if is_tabs else None
+            
+            if current_source.keys().isdisjoint(current_target):
+                # Nothing to merge into: a plain update is enough
+                current_target.update(current_source)
             else:
-                target[key] = value
+                for key, value in current_source.items():
+                    existing = current_target.get(key)
+                    if isinstance(existing, dict) and isinstance(value, dict):
+                        stack.append((existing, value, key == "tabs" and not is_tabs))
+                    else:
+                        current_target[key] = value
+            
+            # Restore starred at the end if it existed
+            if starred_value is not None:
+                current_target["starred"] = starred_value
     
     def deep_merge_tabs(self, target_tabs: dict, source_tabs: dict) -> None:
         """Deep merge tabs while preserving 'starred' at the end."""
-        # Extract starred value if it exists
-        starred_value = target_tabs.pop("starred", None)
-        
-        # Perform normal deep merge
-        for key, value in source_tabs.items():
-            if key in target_tabs and isinstance(target_tabs[key], dict) and isinstance(value, dict):
-                self.deep_merge(target_tabs[key], value)
-            else:
-                target_tabs[key] = value
-        
-        # Restore starred at the end if it existed
-        if starred_value is not None:
-            target_tabs["starred"] = starred_value
+        self.deep_merge({"tabs": target_tabs}, {"tabs": source_tabs})
+    
+    def _is_trivial_patch(self, patch_file: str) -> bool:
+        """Detect an empty patch ('', '{}' or '[]') from its size without parsing it."""
+        if os.stat(patch_file).st_size > 2:
+            return False
+        return _read_all(patch_file).strip() in (b'', b'{}', b'[]')
     
+    @_holds_config_lock
     def apply_config_patch(self, patch_file: str) -> bool:
         """Apply configuration patch."""
         if not os.path.exists(patch_file):
@@ -155,8 +426,11 @@ class ConfigManager:
             return True
         
         try:
-            with open(patch_file, 'r') as f:
-                patch_data = json.load(f)
+            if self._is_trivial_patch(patch_file):
+                self.logger.info("Empty config patch, skipping")
+                return True
+            
+            patch_data = _json_loads(_read_all(patch_file))
             
             if not patch_data:  # Empty patch
                 self.logger.info("Empty config patch, skipping")
@@ -166,16 +440,15 @@ class ConfigManager:
             self.config_backup = self.create_backup(self.homeserver_config_path)
             
             # Read current config or use factory/default
+            original_bytes = None
             if os.path.exists(self.homeserver_config_path):
-                with open(self.homeserver_config_path, 'r') as f:
-                    config_data = json.load(f)
+                config_data, original_bytes = self._take_config()
             else:
                 # Config doesn't exist - try factory fallback or create minimal config
                 factory_config = "/etc/homeserver.factory"
                 if os.path.exists(factory_config):
                     self.logger.info(f"Config missing, using factory config: {factory_config}")
-                    with open(factory_config, 'r') as f:
-                        config_data = json.load(f)
+                    config_data = _json_loads(_read_all(factory_config))
                 else:
                     # Create minimal valid config structure
                     self.logger.warning("Config missing and no factory config, creating minimal config")
@@ -190,26 +463,25 @@ class ConfigManager:
             
             # Apply patch (deep merge)
             self.deep_merge(config_data, patch_data)
+            config_bytes = self._serialize_config(config_data)
             
-            # Write temporary config for validation
-            temp_config = f"{self.homeserver_config_path}.temp"
-            with open(temp_config, 'w') as f:
-                json.dump(config_data, f, indent=2)
+            # Re-applying an already-merged patch leaves the file unchanged: skip validation and writes
+            if config_bytes == original_bytes:
+                self._remember_config(config_data, config_bytes)
+                self.logger.info("Config patch is a no-op, configuration already up to date")
+                return True
             
-            # Validate with factoryFallback
-            if not self.validate_config_with_factory_fallback(temp_config):
-                os.remove(temp_config)
+            # Write once and validate in place; reverted automatically on failure
+            if not self._install_validated_config(config_bytes):
                 self.logger.error("Config patch validation failed")
                 return False
             
-            # Apply the validated config
-            shutil.move(temp_config, self.homeserver_config_path)
-            
             # CRITICAL: Restore proper permissions after config modification
             if not self._restore_config_permissions():
                 self.logger.error("Failed to restore config permissions after patch application")
                 return False
             
+            self._remember_config(config_data, config_bytes)
             self.logger.info("Config patch applied successfully")
             return True
             
@@ -217,6 +489,7 @@ class ConfigManager:
             self.logger.error(f"Failed to apply config patch: {str(e)}")
             return False
     
+    @_holds_config_lock
     def rollback_config(self) -> bool:
         """Rollback configuration changes."""
         if self.config_backup:
@@ -232,8 +505,7 @@ class ConfigManager:
         target_path = config_path or self.homeserver_config_path
         
         try:
-            with open(target_path, 'r') as f:
-                json.load(f)
+            _json_loads(_read_all(target_path))
             return True
         except json.JSONDecodeError as e:
             self.logger.error(f"Invalid JSON syntax in {target_path}: {str(e)}")
@@ -242,13 +514,76 @@ class ConfigManager:
             self.logger.error(f"Error validating config syntax: {str(e)}")
             return False
     
+    def _load_config(self) -> dict:
+        """Return the parsed live config, reparsing only when the file has changed."""
+        st = os.stat(self.homeserver_config_path)
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if self._config_cache and self._config_cache[0] == signature:
+            return self._config_cache[1]
+        
+        raw = _read_all(self.homeserver_config_path)
+        config = _json_loads(raw)
+        self._config_cache = (signature, config, raw)
+        return config
+    
+    def _take_config(self) -> Tuple[dict, bytes]:
+        """Return the live config and its bytes for mutation, dropping them from the cache."""
+        config = self._load_config()
+        raw = self._config_cache[2]
+        self._config_cache = None
+        return config, raw
+    
+    def _remember_config(self, config: dict, config_bytes: bytes) -> None:
+        """Cache a config just written to disk so the next read needs no reparse."""
+        st = os.stat(self.homeserver_config_path)
+        self._config_cache = ((st.st_mtime_ns, st.st_size, st.st_ino), config, config_bytes)
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Batch several set_config_value calls into one read, validation and write.
+        
+        The config is parsed once on entry and set_config_value only mutates
+        it in memory. On a clean exit any changes are validated with
+        factoryFallback.sh and renamed into place once; on an exception they
+        are discarded. Raises ConfigTransactionError if the commit fails.
+        Nested transactions join the outermost one.
+        """
+        with self._config_lock():
+            if self._txn_config is not None:
+                yield self
+                return
+            
+            if not self.config_backup:
+                self.config_backup = self.create_backup(self.homeserver_config_path)
+            # Take ownership of the parsed dict; the cache no longer describes it once mutated
+            self._txn_config, _ = self._take_config()
+            self._txn_dirty = False
+            
+            try:
+                yield self
+                if self._txn_dirty:
+                    self._commit_transaction()
+            finally:
+                self._txn_config = None
+                self._txn_dirty = False
+    
+    def _commit_transaction(self) -> None:
+        """Validate and write the transaction's config, then restore permissions."""
+        config_bytes = self._serialize_config(self._txn_config)
+        if not self._install_validated_config(config_bytes):
+            raise ConfigTransactionError("Config transaction validation failed")
+        if not self._restore_config_permissions():
+            raise ConfigTransactionError("Failed to restore config permissions after transaction")
+        self._remember_config(self._txn_config, config_bytes)
+        self.logger.info("Config transaction committed")
+    
     def get_config_value(self, key_path: str, default: Any = None) -> Any:
         """Get a value from the configuration using dot notation."""
         try:
-            with open(self.homeserver_config_path, 'r') as f:
-                config = json.load(f)
+            config = self._txn_config if self._txn_config is not None else self._load_config()
             
-            keys = key_path.split('.')
+            keys = _split_key_path(key_path)
             value = config
             
             for key in keys:
@@ -257,49 +592,64 @@ class ConfigManager:
                 else:
                     return default
             
+            # Hand out a copy of containers so callers can't mutate the cached config
+            if isinstance(value, (dict, list)):
+                return copy.deepcopy(value)
             return value
             
         except Exception as e:
             self.logger.error(f"Error getting config value for {key_path}: {str(e)}")
             return default
     
+    @_holds_config_lock
     def set_config_value(self, key_path: str, value: Any) -> bool:
         """Set a value in the configuration using dot notation."""
         try:
+            # Inside a transaction only the in-memory config changes; it is written on commit
+            if self._txn_config is not None:
+                self._assign_key_path(self._txn_config, key_path, value)
+                self._txn_dirty = True
+                return True
+            
             # Create backup first
             if not self.config_backup:
                 self.config_backup = self.create_backup(self.homeserver_config_path)
             
-            with open(self.homeserver_config_path, 'r') as f:
-                config = json.load(f)
+            config, _ = self._take_config()
+            self._assign_key_path(config, key_path, value)
             
-            keys = key_path.split('.')
-            current = config
-            
-            # Navigate to the parent of the target key
-            for key in keys[:-1]:
-                if key not in current:
-                    current[key] = {}
-                current = current[key]
-            
-            # Set the value
-            current[keys[-1]] = value
-            
-            # Write the updated config
-            with open(self.homeserver_config_path, 'w') as f:
-                json.dump(config, f, indent=2)
+            # Write the updated config (renamed into place, never rewritten in place)
+            config_bytes = self._serialize_config(config)
+            os.replace(self._write_temp_config(config_bytes), self.homeserver_config_path)
             
             # CRITICAL: Restore proper permissions after config modification
             if not self._restore_config_permissions():
                 self.logger.error("Failed to restore config permissions after setting value")
                 return False
             
+            # The serialized bytes are what is on disk now; keep them with the dict
+            self._remember_config(config, config_bytes)
             return True
             
         except Exception as e:
             self.logger.error(f"Error setting config value for {key_path}: {str(e)}")
             return False
     
+    def _assign_key_path(self, config: dict, key_path: str, value: Any) -> None:
+        """Set a dotted key path in config, creating intermediate dicts as needed."""
+        keys = _split_key_path(key_path)
+        current = config
+        
+        # Navigate to the parent of the target key
+        for key in keys[:-1]:
+            if key not in current:
+                current[key] = {}
+            current = current[key]
+        
+        # Set a copy, so later changes to the caller's value never reach the cached config
+        current[keys[-1]] = copy.deepcopy(value)
+    
+    @_holds_config_lock
     def revert_config_patch(self, patch_file: str) -> bool:
         """Revert a configuration patch by removing the keys it added."""
         if not os.path.exists(patch_file):
@@ -307,8 +657,11 @@ class ConfigManager:
             return True
         
         try:
-            with open(patch_file, 'r') as f:
-                patch_data = json.load(f)
+            if self._is_trivial_patch(patch_file):
+                self.logger.info("Empty config patch, nothing to revert")
+                return True
+            
+            patch_data = _json_loads(_read_all(patch_file))
             
             if not patch_data:  # Empty patch
                 self.logger.info("Empty config patch, nothing to revert")
@@ -319,35 +672,28 @@ class ConfigManager:
                 self.config_backup = self.create_backup(self.homeserver_config_path)
             
             # Read current config
-            with open(self.homeserver_config_path, 'r') as f:
-                config_data = json.load(f)
+            config_data, original_bytes = self._take_config()
             
             # Remove the keys that were added by the patch
             modified = self._remove_patch_keys(config_data, patch_data)
             
             if not modified:
+                self._remember_config(config_data, original_bytes)
                 self.logger.info("No configuration changes to revert")
                 return True
             
-            # Write temporary config for validation
-            temp_config = f"{self.homeserver_config_path}.temp"
-            with open(temp_config, 'w') as f:
-                json.dump(config_data, f, indent=2)
-            
-            # Validate with factoryFallback
-            if not self.validate_config_with_factory_fallback(temp_config):
-                os.remove(temp_config)
+            # Write once and validate in place; reverted automatically on failure
+            config_bytes = self._serialize_config(config_data)
+            if not self._install_validated_config(config_bytes):
                 self.logger.error("Config patch revert validation failed")
                 return False
             
-            # Apply the validated config
-            shutil.move(temp_config, self.homeserver_config_path)
-            
             # CRITICAL: Restore proper permissions after config modification
             if not self._restore_config_permissions():
                 self.logger.error("Failed to restore config permissions after patch revert")
                 return False
             
+            self._remember_config(config_data, config_bytes)
             self.logger.info("Config patch reverted successfully")
             return True
             
@@ -358,27 +704,31 @@ class ConfigManager:
     def _remove_patch_keys(self, config: dict, patch: dict, path: str = "") -> bool:
         """Remove keys from config that were added by patch."""
         modified = False
+        stack = [(config, patch, path)]
         
-        for key, value in patch.items():
-            current_path = f"{path}.{key}" if path else key
+        while stack:
+            current_config, current_patch, current_base = stack.pop()
             
-            if key in config:
-                if isinstance(value, dict) and isinstance(config[key], dict):
+            for key, value in current_patch.items():
+                current_path = f"{current_base}.{key}" if current_base else key
+                
+                if key not in current_config:
+                    continue
+                
+                if isinstance(value, dict) and isinstance(current_config[key], dict):
                     # Special handling for tabs - if we're at the tabs level, remove the entire tab
-                    if path == "tabs":
-                        del config[key]
+                    if current_base == "tabs":
+                        del current_config[key]
                         modified = True
                         self.logger.debug(f"Removed tab: {current_path}")
                         continue
                     
-                    # For other nested dicts, recursively remove keys
-                    nested_modified = self._remove_patch_keys(config[key], value, current_path)
-                    if nested_modified:
-                        modified = True
+                    # For other nested dicts, remove keys on a later pass
+                    stack.append((current_config[key], value, current_path))
                 else:
                     # Remove the key if it matches the patch value
-                    if config[key] == value:
-                        del config[key]
+                    if current_config[key] == value:
+                        del current_config[key]
                         modified = True
                         self.logger.debug(f"Removed config key: {current_path}")
                     else:
@@ -402,20 +752,58 @@ class ServiceManager:
     def __init__(self, logger):
         self.logger = logger
         self.service_states: Dict[str, str] = {}
+        self._systemd = self._connect_systemd()
+    
+    def _connect_systemd(self):
+        """Open a persistent D-Bus connection to systemd when pystemd is installed."""
+        if SystemdManager is None:
+            return None
+        try:
+            manager = SystemdManager()
+            manager.load()
+            return manager
+        except Exception as e:
+            self.logger.debug(f"systemd D-Bus unavailable, using systemctl: {str(e)}")
+            return None
+    
+    def _systemctl(self, action: str, service_names: List[str]) -> None:
+        """Run a unit action over D-Bus when connected, otherwise through systemctl."""
+        if self._systemd is None:
+            self._run_command(["systemctl", action, *service_names])
+            return
+        
+        self.logger.debug(f"systemd D-Bus {action}: {' '.join(service_names)}")
+        unit_method = getattr(self._systemd.Manager, f"{action.capitalize()}Unit")
+        jobs = {unit_method(name.encode(), b"replace") for name in service_names}
+        self._wait_for_jobs(jobs)
+        
+        # A finished job may still have failed; check where each unit ended up, so a
+        # failed job raises here the way a non-zero systemctl exit does on the other path
+        failed = []
+        for name, state in self._bulk_status(service_names).items():
+            if action == "stop":
+                ok = state not in ("active", "activating", "deactivating")
+            else:
+                ok = state == "active"
+            if not ok:
+                failed.append(f"{name} ({state})")
+        if failed:
+            raise RuntimeError(f"systemd {action} job failed for {', '.join(failed)}")
+    
+    def _wait_for_jobs(self, jobs: set) -> None:
+        """Block until queued systemd jobs finish, as systemctl does by default."""
+        deadline = time.monotonic() + SYSTEMD_JOB_TIMEOUT
+        while jobs:
+            jobs &= {job[4] for job in self._systemd.Manager.ListJobs()}
+            if not jobs:
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for {len(jobs)} systemd job(s)")
+            time.sleep(0.1)
     
     def _run_command(self, cmd: List[str], check: bool = True, capture_output: bool = True) -> subprocess.CompletedProcess:
         """Run a command with logging."""
-        cmd_str = ' '.join(cmd)
-        self.logger.debug(f"Running command: {cmd_str}")
-        try:
-            result = subprocess.run(cmd, check=check, capture_output=capture_output, text=True)
-            if result.stdout:
-                self.logger.debug(f"Command output: {result.stdout.strip()}")
-            return result
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"Command failed: {cmd_str}")
-            self.logger.error(f"Error: {e.stderr if e.stderr else str(e)}")
-            raise
+        return _run_command(self.logger, cmd, check=check, capture_output=capture_output)
     
     def get_service_status(self, service_name: str) -> str:
         """Get the status of a systemd service."""
@@ -425,14 +813,48 @@ class ServiceManager:
         except Exception:
             return "unknown"
     
+    def _bulk_status(self, service_names: List[str]) -> Dict[str, str]:
+        """Get the status of several systemd services with one systemctl call."""
+        statuses = {name: "unknown" for name in service_names}
+        if not service_names:
+            return statuses
+        try:
+            # is-active prints one state per unit, in order, and exits non-zero if any is inactive
+            result = self._run_command(["systemctl", "is-active", *service_names], check=False)
+            lines = result.stdout.splitlines()
+            if len(lines) == len(service_names):
+                statuses.update(zip(service_names, (line.strip() for line in lines)))
+        except Exception as e:
+            self.logger.error(f"Failed to query service states: {str(e)}")
+        return statuses
+    
+    def _run_batched_action(self, action: str, service_names: List[str], verify: bool = True) -> bool:
+        """Run one unit action across several services, optionally verifying they are active."""
+        try:
+            self._systemctl(action, service_names)
+        except Exception as e:
+            self.logger.error(f"Failed to {action} services {', '.join(service_names)}: {str(e)}")
+            return False
+        
+        if not verify:
+            return True
+        
+        success = True
+        for service_name, status in self._bulk_status(service_names).items():
+            if status != "active":
+                self.logger.error(f"{service_name} service failed to {action} (status: {status})")
+                success = False
+        return success
+    
     def restart_service(self, service_name: str) -> bool:
         """Restart a systemd service."""
         try:
-            # Store current state for rollback
-            self.service_states[service_name] = self.get_service_status(service_name)
+            # Store the state from before the first change for rollback
+            if service_name not in self.service_states:
+                self.service_states[service_name] = self.get_service_status(service_name)
             
             self.logger.info(f"Restarting {service_name} service")
-            self._run_command(["systemctl", "restart", service_name])
+            self._systemctl("restart", [service_name])
             
             # Verify service is running
             status = self.get_service_status(service_name)
@@ -450,11 +872,12 @@ class ServiceManager:
     def stop_service(self, service_name: str) -> bool:
         """Stop a systemd service."""
         try:
-            # Store current state for rollback
-            self.service_states[service_name] = self.get_service_status(service_name)
+            # Store the state from before the first change for rollback
+            if service_name not in self.service_states:
+                self.service_states[service_name] = self.get_service_status(service_name)
             
             self.logger.info(f"Stopping {service_name} service")
-            self._run_command(["systemctl", "stop", service_name])
+            self._systemctl("stop", [service_name])
             
             self.logger.info(f"{service_name} service stopped successfully")
             return True
@@ -467,7 +890,7 @@ class ServiceManager:
         """Start a systemd service."""
         try:
             self.logger.info(f"Starting {service_name} service")
-            self._run_command(["systemctl", "start", service_name])
+            self._systemctl("start", [service_name])
             
             # Verify service is running
             status = self.get_service_status(service_name)
@@ -486,7 +909,7 @@ class ServiceManager:
         """Reload a systemd service."""
         try:
             self.logger.info(f"Reloading {service_name} service")
-            self._run_command(["systemctl", "reload", service_name])
+            self._systemctl("reload", [service_name])
             
             self.logger.info(f"{service_name} service reloaded successfully")
             return True
@@ -499,27 +922,43 @@ class ServiceManager:
         """Restart all homeserver-related services."""
         services = ["gunicorn.service"]
         
-        for service in services:
-            if not self.restart_service(service):
-                return False
+        # Store pre-batch states for rollback, then restart and verify all units in one call each.
+        # Only the first call records a service: on a retry it may already be failed or activating
+        unrecorded = [name for name in services if name not in self.service_states]
+        for service_name, status in self._bulk_status(unrecorded).items():
+            self.service_states.setdefault(service_name, status)
         
+        self.logger.info(f"Restarting services: {', '.join(services)}")
+        if not self._run_batched_action("restart", services):
+            return False
+        
+        self.logger.info(f"Services restarted successfully: {', '.join(services)}")
         return True
     
     def rollback_service_states(self) -> None:
         """Rollback services to their previous states."""
         self.logger.info("Rolling back service states")
         
+        # Query every service once up front; the actions below fail if their unit jobs fail
+        current_states = self._bulk_status(list(self.service_states))
+        
+        to_start: List[str] = []
+        to_stop: List[str] = []
         for service_name, previous_state in self.service_states.items():
-            try:
-                current_state = self.get_service_status(service_name)
-                
-                if previous_state == "active" and current_state != "active":
-                    self.start_service(service_name)
-                elif previous_state != "active" and current_state == "active":
-                    self.stop_service(service_name)
-                    
-            except Exception as e:
-                self.logger.error(f"Error rolling back {service_name} service: {str(e)}")
+            current_state = current_states[service_name]
+            
+            if previous_state == "active" and current_state != "active":
+                to_start.append(service_name)
+            elif previous_state != "active" and current_state == "active":
+                to_stop.append(service_name)
+        
+        # One systemctl invocation per action instead of one per service
+        if to_start:
+            self.logger.info(f"Starting services: {', '.join(to_start)}")
+            self._run_batched_action("start", to_start, verify=False)
+        if to_stop:
+            self.logger.info(f"Stopping services: {', '.join(to_stop)}")
+            self._run_batched_action("stop", to_stop, verify=False)
         
         # Clear service states
         self.service_states.clear()
@@ -537,56 +976,59 @@ class BuildManager:
         self.logger = logger
         self.build_dir = build_dir
         self.build_log_path = build_log_path
-        # Ensure log directory exists and touch the log file before any writes
+        self._log_fh = None
+        # Ensure log directory exists and keep one handle open for all writes
         try:
             os.makedirs(os.path.dirname(self.build_log_path), exist_ok=True)
-            with open(self.build_log_path, 'a'):
-                pass
+            self._log_fh = open(self.build_log_path, 'a', encoding='utf-8', buffering=8192)
         except Exception as e:
             # Do not fail the installer if log file can't be created; just warn
             self.logger.warning(f"Unable to initialize build log '{self.build_log_path}': {str(e)}")
     
-    def _append_to_build_log(self, content: str) -> None:
+    def _append_to_build_log(self, content: str, flush: bool = False) -> None:
         """Append text to the dedicated build log, prefixing with a timestamp."""
         try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            with open(self.build_log_path, 'a', encoding='utf-8') as f:
-                f.write(f"[{timestamp}] {content}\n")
+            if self._log_fh is None:
+                self._log_fh = open(self.build_log_path, 'a', encoding='utf-8', buffering=8192)
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+            self._log_fh.write(f"[{timestamp}] {content}\n")
+            if flush:
+                self._log_fh.flush()
         except Exception as e:
             # Non-fatal; emit to main logger
             self.logger.warning(f"Failed writing to build log '{self.build_log_path}': {str(e)}")
     
+    def _flush_build_log(self) -> None:
+        """Push buffered build log lines to disk."""
+        try:
+            if self._log_fh is not None:
+                self._log_fh.flush()
+        except Exception as e:
+            self.logger.warning(f"Failed flushing build log '{self.build_log_path}': {str(e)}")
+    
+    def close(self) -> None:
+        """Flush and close the build log handle."""
+        if self._log_fh is not None:
+            self._flush_build_log()
+            try:
+                self._log_fh.close()
+            except Exception:
+                pass
+            self._log_fh = None
+    
+    def __del__(self):
+        self.close()
+    
     def _run_command(self, cmd: List[str], check: bool = True, capture_output: bool = True, cwd: str = None) -> subprocess.CompletedProcess:
         """Run a command with logging and append all output to the build log."""
-        cmd_str = ' '.join(cmd)
         run_dir = cwd if cwd else os.getcwd()
-        if cwd:
-            self.logger.debug(f"Running command in {cwd}: {cmd_str}")
-        else:
-            self.logger.debug(f"Running command: {cmd_str}")
-        # Emit command line to build log first
-        self._append_to_build_log(f"$ (cwd={run_dir}) {cmd_str}")
+        # Emit command line to build log first, then stream output into it as it is produced
+        self._append_to_build_log(f"$ (cwd={run_dir}) {' '.join(cmd)}", flush=True)
         try:
-            result = subprocess.run(cmd, check=check, capture_output=capture_output, text=True, cwd=cwd)
-            if result.stdout:
-                self.logger.debug(f"Command output: {result.stdout.strip()}")
-            # Append captured output to build log
-            stdout_txt = (result.stdout or '').rstrip()
-            stderr_txt = (result.stderr or '').rstrip()
-            if stdout_txt:
-                self._append_to_build_log(stdout_txt)
-            if stderr_txt:
-                self._append_to_build_log(f"[stderr] {stderr_txt}")
-            return result
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"Command failed: {cmd_str}")
-            self.logger.error(f"Error: {e.stderr if e.stderr else str(e)}")
-            # Append failure details to build log as well
-            if getattr(e, 'stdout', None):
-                self._append_to_build_log((e.stdout or '').rstrip())
-            if getattr(e, 'stderr', None):
-                self._append_to_build_log(f"[stderr] {(e.stderr or '').rstrip()}")
-            raise
+            return _run_command(self.logger, cmd, check=check, capture_output=capture_output,
+                                cwd=cwd, tee=self._append_to_build_log)
+        finally:
+            self._flush_build_log()
     
     def rebuild_frontend(self) -> bool:
         """Rebuild the frontend."""
@@ -595,19 +1037,17 @@ class BuildManager:
             self._append_to_build_log("=== Frontend build start ===")
             result = self._run_command(["npm", "run", "build"], cwd=self.build_dir)
             self.logger.info("Frontend build completed")
-            self._append_to_build_log("=== Frontend build completed successfully ===")
+            self._append_to_build_log("=== Frontend build completed successfully ===", flush=True)
             return True
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Frontend build failed with exit code {e.returncode}")
             if e.stdout:
-                self.logger.error(f"Build stdout: {e.stdout}")
-            if e.stderr:
-                self.logger.error(f"Build stderr: {e.stderr}")
-            self._append_to_build_log(f"=== Frontend build failed (exit={e.returncode}) ===")
+                self.logger.error(f"Build output (tail): {e.stdout}")
+            self._append_to_build_log(f"=== Frontend build failed (exit={e.returncode}) ===", flush=True)
             return False
         except Exception as e:
             self.logger.error(f"Frontend build failed: {str(e)}")
-            self._append_to_build_log(f"=== Frontend build failed: {str(e)} ===")
+            self._append_to_build_log(f"=== Frontend build failed: {str(e)} ===", flush=True)
             return False
     
     def install_npm_dependencies(self) -> bool:
@@ -617,11 +1057,11 @@ class BuildManager:
             self._append_to_build_log("=== NPM install start ===")
             self._run_command(["npm", "install"], cwd=self.build_dir)
             self.logger.info("NPM dependencies installed")
-            self._append_to_build_log("=== NPM install completed successfully ===")
+            self._append_to_build_log("=== NPM install completed successfully ===", flush=True)
             return True
         except Exception as e:
             self.logger.error(f"Failed to install NPM dependencies: {str(e)}")
-            self._append_to_build_log(f"=== NPM install failed: {str(e)} ===")
+            self._append_to_build_log(f"=== NPM install failed: {str(e)} ===", flush=True)
             return False
     
     def clean_build(self) -> bool:
@@ -631,11 +1071,11 @@ class BuildManager:
             build_path = os.path.join(self.build_dir, "build")
             if os.path.exists(build_path):
                 self._append_to_build_log(f"Removing build directory: {build_path}")
-                shutil.rmtree(build_path)
+                _remove_tree(build_path)
             self.logger.info("Build artifacts cleaned")
-            self._append_to_build_log("Build artifacts cleaned")
+            self._append_to_build_log("Build artifacts cleaned", flush=True)
             return True
         except Exception as e:
             self.logger.error(f"Failed to clean build artifacts: {str(e)}")
-            self._append_to_build_log(f"Failed to clean build artifacts: {str(e)}")
+            self._append_to_build_log(f"Failed to clean build artifacts: {str(e)}", flush=True)
             return False 
\ No newline at end of file
@@ -7,16 +7,145 @@ Provides atomic operations with rollback capabilities.
 """
 
 import os
+import stat
+import errno
 import shutil
 import hashlib
+import tempfile
 import pwd
 import grp
 import subprocess
+import threading
+import time
+import functools
 from pathlib import Path
-from typing import Optional, List
+from typing import Callable, Dict, Optional, List, Set, Iterable, Tuple
 from dataclasses import dataclass
-from datetime import datetime
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+# hashlib.file_digest (3.11+) feeds the hash from a reused buffer in C
+_hashlib_file_digest = getattr(hashlib, 'file_digest', None)
+
+
+# Chunk size for streaming file hashes and copies
+IO_CHUNK_SIZE = 1 << 20
+
+# Errors meaning a kernel copy primitive is unsupported for this pair of files
+_KERNEL_COPY_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+# Leading whitespace of the first line that registers a blueprint
+_BLUEPRINT_INDENT_RE = re.compile(rb'^([^\S\n]*)[^\n]*?app\.register_blueprint\(', re.MULTILINE)
+
+# Upper bound on threads restoring independent targets during rollback
+MAX_ROLLBACK_WORKERS = 8
+
+# Sudoers files visudo has accepted in this process, keyed by content digest,
+# owner and mode; an identical file is not re-checked on the next install
+_VISUDO_ACCEPTED = set()
+
+# Minimal environment for visudo; sbin must be on PATH for it to be found
+_VISUDO_ENV = {"PATH": "/usr/sbin:/usr/bin:/sbin:/bin"}
+
+# Install roots that exist on every homeserver; seeded into the known-directory cache
+KNOWN_BASE_DIRECTORIES = (
+    "/var/www/homeserver/src/tablets",
+    "/var/www/homeserver/backend",
+    "/etc/sudoers.d",
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _resolve_user_group(user: str, group: str) -> Tuple[int, int]:
+    """Resolve a user/group pair to (uid, gid) once per process."""
+    return pwd.getpwnam(user).pw_uid, grp.getgrnam(group).gr_gid
+
+
+def _read_into_bytearray(path: str) -> bytearray:
+    """Read a whole file into a single preallocated buffer."""
+    with open(path, 'rb', buffering=0) as f:
+        buffer = bytearray(os.fstat(f.fileno()).st_size)
+        read = f.readinto(buffer)
+        del buffer[read:]
+    return buffer
+
+
+@functools.lru_cache(maxsize=64)
+def _appended_block_re(identifier: str) -> re.Pattern:
+    """Pattern matching the full lines of an appended block, markers included."""
+    escaped = re.escape(identifier.encode())
+    return re.compile(
+        rb'^[^\n]*?# PREMIUM_TAB_IDENTIFIER: ' + escaped + rb'.*?# END_PREMIUM_TAB_IDENTIFIER: ' + escaped + rb'[^\n]*\n?',
+        re.MULTILINE | re.DOTALL,
+    )
+
+
+def _render_backend_registration(tab_name: str) -> bytes:
+    """Blueprint import and registration lines for a tab, relative to the main backend package."""
+    return (
+        f"# {tab_name.title()} Premium Tab Blueprint Registration\n"
+        f"from .{tab_name}.routes import bp as {tab_name}_bp\n"
+        f"app.register_blueprint({tab_name}_bp)"
+    ).encode()
+
+
+def _line_indent(content: bytes, pos: int) -> int:
+    """Width of the leading whitespace on the line containing content[pos]."""
+    line_start = content.rfind(b'\n', 0, pos) + 1
+    line_end = content.find(b'\n', pos)
+    line = content[line_start:line_end if line_end != -1 else len(content)]
+    return len(line) - len(line.lstrip())
+
+
+def _is_empty_dir(path: str) -> bool:
+    """True if path is a directory with no entries; stops at the first entry found."""
+    with os.scandir(path) as entries:
+        return next(entries, None) is None
+
+
+def _kernel_copy(copy_fn, src_fd: int, dst_fd: int) -> bool:
+    """Copy src_fd to dst_fd with a kernel primitive; False if it is unsupported before any data moved."""
+    copied = 0
+    try:
+        while True:
+            sent = copy_fn(src_fd, dst_fd, IO_CHUNK_SIZE)
+            if sent == 0:
+                break
+            copied += sent
+    except OSError as e:
+        if copied == 0 and e.errno in _KERNEL_COPY_FALLBACK_ERRNOS:
+            return False
+        raise
+    return copied > 0 or os.fstat(src_fd).st_size == 0
+
+
+def _sendfile(src_fd: int, dst_fd: int, count: int) -> int:
+    return os.sendfile(dst_fd, src_fd, None, count)
+
+
+def _fast_copy(src: str, dst: str, on_written: Optional[Callable[[int], None]] = None) -> None:
+    """
+    Copy file contents kernel-side and carry over timestamps.
+    
+    Tries copy_file_range (reflinks on CoW filesystems), then sendfile, then a
+    reused 1 MiB buffer. Mode and ownership are left to the caller, which sets
+    them explicitly, so copystat's xattr/ACL scan is skipped. on_written, if
+    given, receives the destination fd before it is closed so metadata can be
+    applied without another path lookup.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        src_stat = os.fstat(src_fd)
+        copied = (hasattr(os, 'copy_file_range') and _kernel_copy(os.copy_file_range, src_fd, dst_fd)) \
+            or _kernel_copy(_sendfile, src_fd, dst_fd)
+        if not copied:
+            buffer = memoryview(bytearray(IO_CHUNK_SIZE))
+            while read := fsrc.readinto(buffer):
+                fdst.write(buffer[:read])
+        if on_written is not None:
+            fdst.flush()
+            on_written(dst_fd)
+    os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
 
 
 @dataclass
@@ -43,21 +172,47 @@ class FileOperationsManager:
         }
     }
     
-    def __init__(self, logger):
+    # Encoded (start, end) markers for searching file contents held as bytes
+    _APPEND_MARKERS_ENCODED = {
+        name: (config["start"].encode(), config["end"].encode())
+        for name, config in APPEND_MARKERS.items()
+    }
+    
+    def __init__(self, logger, known_directories: Optional[Set[str]] = None):
         self.logger = logger
         self.operations_history: List[FileOperation] = []
         self.created_directories: List[str] = []
+        
+        # Serializes read-modify-write of shared append targets across concurrent tab installs
+        self._append_lock = threading.Lock()
+        
+        # Directories already verified or created; callers may share one set per batch
+        self.known_directories: Set[str] = known_directories if known_directories is not None else set()
+        self.known_directories.update(d for d in KNOWN_BASE_DIRECTORIES if os.path.isdir(d))
     
     def create_backup(self, file_path: str) -> Optional[str]:
         """Create a backup of a file and return backup path."""
-        if not os.path.exists(file_path):
+        backup_path = self._backup_path(file_path)
+        try:
+            shutil.copy2(file_path, backup_path)
+        except FileNotFoundError:
             return None
-            
-        backup_path = f"/tmp/{os.path.basename(file_path)}.installer_backup.{int(datetime.now().timestamp())}"
-        shutil.copy2(file_path, backup_path)
         self.logger.debug(f"Created backup: {file_path} -> {backup_path}")
         return backup_path
     
+    def create_backup_from_bytes(self, file_path: str, content: bytes) -> str:
+        """Back up a file whose content is already in memory, without reading it again."""
+        backup_path = self._backup_path(file_path)
+        with open(backup_path, 'wb') as f:
+            f.write(content)
+        shutil.copystat(file_path, backup_path)
+        self.logger.debug(f"Created backup: {file_path} -> {backup_path}")
+        return backup_path
+    
+    def _backup_path(self, file_path: str) -> str:
+        """Build the /tmp backup path for file_path."""
+        return f"/tmp/{file_path.rpartition('/')[2]}.installer_backup.{time.time_ns()}"
+    
     def restore_backup(self, backup_path: str, target_path: str) -> bool:
         """Restore a file from backup."""
         if not backup_path or not os.path.exists(backup_path):
@@ -75,37 +230,57 @@ class FileOperationsManager:
         """Create directory structure for target path and track created directories."""
         target_dir = os.path.dirname(target_path)
         
-        if os.path.exists(target_dir):
+        if not target_dir or target_dir in self.known_directories:
             return True
         
         try:
-            # Find which directories need to be created
-            path_parts = []
-            current_path = target_dir
-            
-            while current_path and not os.path.exists(current_path):
-                path_parts.append(current_path)
-                current_path = os.path.dirname(current_path)
+            # Try mkdir directly and only step up on ENOENT: an existing directory costs
+            # one syscall and no ancestor is stat'ed unless it is actually missing
+            created = []
+            pending = [target_dir]
+            while pending:
+                dir_path = pending[-1]
+                if dir_path in self.known_directories:
+                    pending.pop()
+                    continue
+                try:
+                    os.mkdir(dir_path, 0o775)
+                except FileExistsError:
+                    pending.pop()
+                    continue
+                except FileNotFoundError:
+                    pending.append(os.path.dirname(dir_path))
+                    continue
+                pending.pop()
+                created.append(dir_path)
+                self.created_directories.append(dir_path)
             
-            # Create directories from parent to child
-            for dir_path in reversed(path_parts):
-                os.makedirs(dir_path, exist_ok=True)
+            # Directories come out parent first; uid/gid lookups are cached
+            for dir_path in created:
                 self.set_permissions(dir_path, "www-data", "www-data", "775")
-                self.created_directories.append(dir_path)
                 self.logger.debug(f"Created directory: {dir_path}")
             
+            self._mark_known_directories((target_dir,))
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to create directory structure for {target_path}: {str(e)}")
             return False
     
+    def _mark_known_directories(self, directories: Iterable[str]) -> None:
+        """Record directories (and their parents) as existing to skip future mkdir checks."""
+        for directory in directories:
+            while directory and directory not in self.known_directories:
+                self.known_directories.add(directory)
+                directory = os.path.dirname(directory)
+                if directory == "/":
+                    break
+    
     def set_permissions(self, path: str, user: str, group: str, mode: str) -> bool:
         """Set file/directory permissions."""
         try:
             # Get user and group IDs
-            uid = pwd.getpwnam(user).pw_uid
-            gid = grp.getgrnam(group).gr_gid
+            uid, gid = _resolve_user_group(user, group)
             
             # Change ownership
             os.chown(path, uid, gid)
@@ -119,14 +294,40 @@ class FileOperationsManager:
             self.logger.error(f"Failed to set permissions on {path}: {str(e)}")
             return False
     
+    def _set_fd_permissions(self, fd: int, path: str, user: str, group: str, mode: str) -> bool:
+        """Set ownership and mode on an already-open file; errors are logged like set_permissions."""
+        try:
+            os.fchown(fd, *_resolve_user_group(user, group))
+            os.fchmod(fd, int(mode, 8))
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to set permissions on {path}: {str(e)}")
+            return False
+    
     def files_identical(self, file1: str, file2: str) -> bool:
         """Check if two files are identical using hash comparison."""
         try:
-            with open(file1, 'rb') as f1, open(file2, 'rb') as f2:
-                return hashlib.md5(f1.read()).hexdigest() == hashlib.md5(f2.read()).hexdigest()
+            stat1, stat2 = os.stat(file1), os.stat(file2)
+            # Same inode (hardlink or same path) is identical by definition
+            if stat1.st_dev == stat2.st_dev and stat1.st_ino == stat2.st_ino:
+                return True
+            # Different sizes can never match; skip reading either file
+            if stat1.st_size != stat2.st_size:
+                return False
+            return self._file_digest(file1) == self._file_digest(file2)
         except Exception:
             return False
     
+    def _file_digest(self, file_path: str) -> bytes:
+        """Hash a file in fixed-size chunks so memory stays bounded for large files."""
+        with open(file_path, 'rb', buffering=0) as f:
+            if _hashlib_file_digest is not None:
+                return _hashlib_file_digest(f, hashlib.blake2b).digest()
+            digest = hashlib.blake2b()
+            while chunk := f.read(IO_CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.digest()
+    
     def perform_symlink_operation(self, operation: FileOperation, tab_path: str) -> bool:
         """Perform a symlink operation."""
         source_path = os.path.join(tab_path, operation.source)
@@ -136,11 +337,17 @@ class FileOperationsManager:
         if not self.create_directory_structure(target_path):
             return False
         
-        # Handle existing files at target
-        if os.path.exists(target_path):
-            if os.path.islink(target_path):
-                # Check if it's already the correct symlink
-                if os.readlink(target_path) == source_path:
+        # Handle existing files at target (one lstat; broken symlinks are seen too)
+        try:
+            target_mode = os.lstat(target_path).st_mode
+        except FileNotFoundError:
+            target_mode = None
+        
+        if target_mode is not None:
+            if stat.S_ISLNK(target_mode):
+                # Check if it's already the correct symlink, comparing canonical paths
+                link_dest = os.path.join(os.path.dirname(target_path), os.readlink(target_path))
+                if os.path.realpath(link_dest) == os.path.realpath(source_path):
                     self.logger.info(f"Symlink already exists: {target_path}")
                     return True
                 else:
@@ -156,9 +363,7 @@ class FileOperationsManager:
             
             # Set permissions on the symlink itself
             try:
-                uid = pwd.getpwnam("www-data").pw_uid
-                gid = grp.getgrnam("www-data").gr_gid
-                os.lchown(target_path, uid, gid)
+                os.lchown(target_path, *_resolve_user_group("www-data", "www-data"))
             except Exception as perm_e:
                 self.logger.warning(f"Could not set symlink permissions on {target_path}: {str(perm_e)}")
             
@@ -172,16 +377,20 @@ class FileOperationsManager:
     
     def perform_append_operation(self, operation: FileOperation, tab_path: str) -> bool:
         """Perform an append operation with markers, respecting indentation context."""
+        with self._append_lock:
+            return self._perform_append_operation_locked(operation, tab_path)
+    
+    def _perform_append_operation_locked(self, operation: FileOperation, tab_path: str) -> bool:
+        """Append implementation; caller must hold the append lock."""
         target_path = operation.target
         
         if not os.path.exists(target_path):
             self.logger.error(f"Target file does not exist: {target_path}")
             return False
         
-        # Read current file content
+        # Read current file content once, as bytes
         try:
-            with open(target_path, 'r') as f:
-                content = f.read()
+            content = _read_into_bytearray(target_path)
         except Exception as e:
             self.logger.error(f"Failed to read target file: {str(e)}")
             return False
@@ -190,65 +399,48 @@ class FileOperationsManager:
         identifier_start = f"# PREMIUM_TAB_IDENTIFIER: {operation.identifier}"
         identifier_end = f"# END_PREMIUM_TAB_IDENTIFIER: {operation.identifier}"
         
-        if identifier_start in content:
+        if identifier_start.encode() in content:
             self.logger.info(f"Identifier already exists, skipping append: {operation.identifier}")
             return True
         
         # Find marker section
-        marker_config = self.APPEND_MARKERS.get(operation.marker)
-        if not marker_config:
+        encoded_markers = self._APPEND_MARKERS_ENCODED.get(operation.marker)
+        if not encoded_markers:
             self.logger.error(f"Unknown append marker: {operation.marker}")
             return False
         
-        start_marker = marker_config["start"]
-        end_marker = marker_config["end"]
+        start_marker, end_marker = encoded_markers
         
-        if start_marker not in content or end_marker not in content:
+        start_marker_pos = content.find(start_marker)
+        end_marker_pos = content.find(end_marker)
+        if start_marker_pos == -1 or end_marker_pos == -1:
             self.logger.error(f"Append markers not found in {target_path}")
             return False
         
-        # Read source content
-        source_path = os.path.join(tab_path, operation.source)
-        try:
-            with open(source_path, 'r') as f:
-                source_content = f.read().strip()
-            
-            # For backend blueprint registration, dynamically generate correct import path AND registration
-            if operation.identifier and "backend" in operation.source:
-                tab_name = operation.identifier
-                
-                # Transform the source content to include both import and registration
-                # Generate relative import from the main backend directory
-                source_content = f"# {tab_name.title()} Premium Tab Blueprint Registration\nfrom .{tab_name}.routes import bp as {tab_name}_bp\napp.register_blueprint({tab_name}_bp)"
-                
-        except Exception as e:
-            self.logger.error(f"Failed to read source file: {str(e)}")
-            return False
-        
-        # Find the proper indentation context by looking at existing blueprint registrations
-        lines = content.split('\n')
-        
-        # Look for existing blueprint registrations to determine proper indentation
-        blueprint_indent = None
-        for i, line in enumerate(lines):
-            if "app.register_blueprint(" in line:
-                blueprint_indent = len(line) - len(line.lstrip())
-                break
-        
-        # If no existing blueprints found, look for the start marker indentation
-        if blueprint_indent is None:
-            for i, line in enumerate(lines):
-                if start_marker in line:
-                    blueprint_indent = len(line) - len(line.lstrip())
-                    break
+        # For backend blueprint registration, dynamically generate correct import path AND
+        # registration; the source file's content would be replaced, so it is not read
+        if operation.identifier and "backend" in operation.source:
+            source_content = _render_backend_registration(operation.identifier)
+        else:
+            source_path = os.path.join(tab_path, operation.source)
+            try:
+                with open(source_path, 'rb') as f:
+                    source_content = f.read().replace(b'\r\n', b'\n').strip()
+            except Exception as e:
+                self.logger.error(f"Failed to read source file: {str(e)}")
+                return False
         
-        # Fallback: use 4-space indentation if nothing else works
-        if blueprint_indent is None:
-            blueprint_indent = 4
+        # Find the proper indentation context by looking at existing blueprint registrations,
+        # falling back to the start marker line and then to 4 spaces
+        blueprint_match = _BLUEPRINT_INDENT_RE.search(content)
+        if blueprint_match:
+            blueprint_indent = len(blueprint_match.group(1))
+        else:
+            blueprint_indent = _line_indent(content, start_marker_pos)
         
         # Apply the detected indentation to source content
-        indent_str = ' ' * blueprint_indent
-        source_lines = source_content.split('\n')
+        indent_str = b' ' * blueprint_indent
+        source_lines = source_content.split(b'\n')
         indented_source_lines = []
         for line in source_lines:
             if line.strip():  # Only indent non-empty lines
@@ -256,24 +448,22 @@ class FileOperationsManager:
             else:
                 indented_source_lines.append(line)
         
-        indented_source_content = '\n'.join(indented_source_lines)
+        indented_source_content = b'\n'.join(indented_source_lines)
         
         # Prepare append content with identifier (also indented)
-        indented_identifier_start = indent_str + identifier_start
-        indented_identifier_end = indent_str + identifier_end
-        append_content = f"\n{indented_identifier_start}\n{indented_source_content}\n{indented_identifier_end}\n"
+        indented_identifier_start = indent_str + identifier_start.encode()
+        indented_identifier_end = indent_str + identifier_end.encode()
+        append_content = indented_identifier_start + b"\n" + indented_source_content + b"\n" + indented_identifier_end + b"\n"
         
-        # Insert content before end marker
-        end_marker_pos = content.find(end_marker)
-        new_content = content[:end_marker_pos] + append_content + content[end_marker_pos:]
+        # Create backup from the bytes already read
+        operation.backup_path = self.create_backup_from_bytes(target_path, content)
         
-        # Create backup
-        operation.backup_path = self.create_backup(target_path)
-        
-        # Write new content
+        # Write new content: splice the insert in as whole lines before the end marker's line,
+        # so the marker keeps its indentation and removing the block restores the file exactly
+        insert_pos = content.rfind(b'\n', 0, end_marker_pos) + 1
         try:
-            with open(target_path, 'w') as f:
-                f.write(new_content)
+            view = memoryview(content)
+            self._replace_file_contents(target_path, (view[:insert_pos], append_content, view[insert_pos:]))
             
             self.logger.debug(f"Appended content to {target_path} with proper indentation ({blueprint_indent} spaces)")
             self.operations_history.append(operation)
@@ -283,20 +473,45 @@ class FileOperationsManager:
             self.logger.error(f"Failed to write appended content: {str(e)}")
             return False
     
+    def _replace_file_contents(self, target_path: str, segments: Iterable[bytes]) -> None:
+        """
+        Atomically replace target_path with segments, keeping its mode and owner.
+        
+        The data is written to a temp file beside the target and fsynced before
+        the rename, so a crash leaves either the old or the new file, never a
+        truncated one.
+        """
+        target_stat = os.stat(target_path)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target_path),
+                                         prefix=f".{os.path.basename(target_path)}.")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for segment in segments:
+                    f.write(segment)
+                os.fchmod(f.fileno(), target_stat.st_mode & 0o7777)
+                os.fchown(f.fileno(), target_stat.st_uid, target_stat.st_gid)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, target_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
     def perform_copy_operation(self, operation: FileOperation, tab_path: str) -> bool:
         """Perform a copy operation."""
         source_path = os.path.join(tab_path, operation.source)
         target_path = operation.target
         
-        # Check if file already exists and is identical
-        if os.path.exists(target_path):
-            if self.files_identical(source_path, target_path):
-                self.logger.debug(f"Identical file already exists: {target_path}")
-                return True
-            else:
-                self.logger.debug(f"Different file exists at target, will overwrite: {target_path}")
-                # Create backup before overwriting
-                operation.backup_path = self.create_backup(target_path)
+        # Check if file already exists and is identical (False when the target is missing)
+        if self.files_identical(source_path, target_path):
+            self.logger.debug(f"Identical file already exists: {target_path}")
+            return True
+        
+        # Create backup before overwriting; None when there is nothing at the target
+        operation.backup_path = self.create_backup(target_path)
+        if operation.backup_path:
+            self.logger.debug(f"Different file exists at target, will overwrite: {target_path}")
         
         # Create target directory structure if needed
         if not self.create_directory_structure(target_path):
@@ -304,16 +519,13 @@ class FileOperationsManager:
         
         # Copy file
         try:
-            shutil.copy2(source_path, target_path)
-            
-            # Set permissions for sudoers files
             if target_path.startswith("/etc/sudoers.d"):
-                self.set_permissions(target_path, "root", "root", "440")
-                # Validate sudoers syntax
-                if not self.validate_sudoers_file(target_path):
+                if not self._install_sudoers_file(source_path, target_path):
                     return False
             else:
-                self.set_permissions(target_path, "www-data", "www-data", "775")
+                # Set permissions on the open descriptor as part of the copy
+                _fast_copy(source_path, target_path,
+                           lambda fd: self._set_fd_permissions(fd, target_path, "www-data", "www-data", "775"))
             
             self.logger.debug(f"Copied file: {source_path} -> {target_path}")
             self.operations_history.append(operation)
@@ -323,11 +535,42 @@ class FileOperationsManager:
             self.logger.error(f"Failed to copy file: {str(e)}")
             return False
     
+    def _install_sudoers_file(self, source_path: str, target_path: str) -> bool:
+        """
+        Stage a sudoers drop-in under a dot-name (which sudo ignores), set root 0440,
+        check it with visudo and only then rename it into place, so sudo never
+        reads it half-written, with default permissions, or invalid.
+        """
+        temp_path = os.path.join(os.path.dirname(target_path), f".{os.path.basename(target_path)}.installer_tmp")
+        try:
+            _fast_copy(source_path, temp_path,
+                       lambda fd: self._set_fd_permissions(fd, temp_path, "root", "root", "440"))
+            if not self.validate_sudoers_file(temp_path):
+                self.logger.error(f"visudo rejected sudoers file, not installing: {source_path}")
+                os.remove(temp_path)
+                return False
+            os.replace(temp_path, target_path)
+            return True
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
     def validate_sudoers_file(self, file_path: str) -> bool:
         """Validate sudoers file syntax."""
         try:
+            file_stat = os.stat(file_path)
+            key = (self._file_digest(file_path), file_stat.st_uid, stat.S_IMODE(file_stat.st_mode))
+            if key in _VISUDO_ACCEPTED:
+                self.logger.debug(f"Sudoers file already accepted by visudo: {file_path}")
+                return True
+            
             result = subprocess.run(["visudo", "-c", "-f", file_path], 
-                                  capture_output=True, text=True)
+                                  capture_output=True, text=True, close_fds=True, env=_VISUDO_ENV)
+            if result.returncode == 0:
+                _VISUDO_ACCEPTED.add(key)
             return result.returncode == 0
         except Exception as e:
             self.logger.error(f"Sudoers validation failed: {str(e)}")
@@ -337,8 +580,37 @@ class FileOperationsManager:
         """Rollback all file operations."""
         self.logger.info("Rolling back file operations")
         
-        # Rollback file operations in reverse order
+        # Rollback file operations in reverse order. Operations on the same target
+        # stay ordered; different targets are independent and restored concurrently.
+        by_target: Dict[str, List[FileOperation]] = {}
         for operation in reversed(self.operations_history):
+            by_target.setdefault(operation.target, []).append(operation)
+        
+        groups = list(by_target.values())
+        if len(groups) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_ROLLBACK_WORKERS, len(groups))) as executor:
+                list(executor.map(self._rollback_target, groups))
+        else:
+            for group in groups:
+                self._rollback_target(group)
+        
+        # Remove created directories in reverse order
+        for directory in reversed(self.created_directories):
+            try:
+                if os.path.isdir(directory) and _is_empty_dir(directory):
+                    os.rmdir(directory)
+                    self.known_directories.discard(directory)
+                    self.logger.debug(f"Removed directory: {directory}")
+            except Exception as e:
+                self.logger.error(f"Error removing directory {directory}: {str(e)}")
+        
+        # Clear history
+        self.operations_history.clear()
+        self.created_directories.clear()
+    
+    def _rollback_target(self, operations: List[FileOperation]) -> None:
+        """Undo operations on one target, newest first."""
+        for operation in operations:
             try:
                 if operation.operation_type == "symlink":
                     if os.path.islink(operation.target):
@@ -358,19 +630,6 @@ class FileOperationsManager:
                         
             except Exception as e:
                 self.logger.error(f"Error during rollback of {operation.target}: {str(e)}")
-        
-        # Remove created directories in reverse order
-        for directory in reversed(self.created_directories):
-            try:
-                if os.path.exists(directory) and not os.listdir(directory):
-                    os.rmdir(directory)
-                    self.logger.debug(f"Removed directory: {directory}")
-            except Exception as e:
-                self.logger.error(f"Error removing directory {directory}: {str(e)}")
-        
-        # Clear history
-        self.operations_history.clear()
-        self.created_directories.clear()
     
     def remove_appended_content(self, target_path: str, identifier: str) -> bool:
         """Remove appended content identified by identifier from target file."""
@@ -379,52 +638,31 @@ class FileOperationsManager:
             return True  # Already removed
         
         try:
-            with open(target_path, 'r') as f:
-                content = f.read()
+            content = _read_into_bytearray(target_path)
         except Exception as e:
             self.logger.error(f"Failed to read target file: {str(e)}")
             return False
         
-        # Find identifier markers
-        identifier_start = f"# PREMIUM_TAB_IDENTIFIER: {identifier}"
-        identifier_end = f"# END_PREMIUM_TAB_IDENTIFIER: {identifier}"
-        
-        if identifier_start not in content:
-            self.logger.info(f"Identifier not found, content already removed: {identifier}")
-            return True
-        
-        # Create backup
-        backup_path = self.create_backup(target_path)
-        
-        # Find and remove the content between markers
-        start_pos = content.find(identifier_start)
-        end_pos = content.find(identifier_end)
-        
-        if start_pos == -1 or end_pos == -1:
+        # One scan finds the whole block, from the start of the start marker's
+        # line through the end of the end marker's line
+        match = _appended_block_re(identifier).search(content)
+        if match is None:
+            if f"# PREMIUM_TAB_IDENTIFIER: {identifier}".encode() not in content:
+                self.logger.info(f"Identifier not found, content already removed: {identifier}")
+                return True
             self.logger.error(f"Could not find complete identifier markers for: {identifier}")
             return False
         
-        # Find the start of the line containing the start marker
-        line_start = content.rfind('\n', 0, start_pos)
-        if line_start == -1:
-            line_start = 0
-        else:
-            line_start += 1  # Move past the newline
-        
-        # Find the end of the line containing the end marker
-        line_end = content.find('\n', end_pos + len(identifier_end))
-        if line_end == -1:
-            line_end = len(content)
-        else:
-            line_end += 1  # Include the newline
+        # Create backup from the bytes already read
+        backup_path = self.create_backup_from_bytes(target_path, content)
         
-        # Remove the content
-        new_content = content[:line_start] + content[line_end:]
+        # Remove the content by writing the slices on either side of the block
+        view = memoryview(content)
+        segments = (view[:match.start()], view[match.end():])
         
         # Write the modified content
         try:
-            with open(target_path, 'w') as f:
-                f.write(new_content)
+            self._replace_file_contents(target_path, segments)
             
             self.logger.info(f"Removed appended content for {identifier} from {target_path}")
             return True
@@ -438,15 +676,21 @@ class FileOperationsManager:
     
     def remove_file_or_symlink(self, target_path: str) -> bool:
         """Remove a file or symlink."""
-        if not os.path.exists(target_path) and not os.path.islink(target_path):
+        try:
+            # One lstat answers existence, link-ness and file type
+            target_mode = os.lstat(target_path).st_mode
+        except FileNotFoundError:
             self.logger.debug(f"File already removed: {target_path}")
             return True
+        except Exception as e:
+            self.logger.error(f"Failed to remove {target_path}: {str(e)}")
+            return False
         
         try:
-            if os.path.islink(target_path):
+            if stat.S_ISLNK(target_mode):
                 os.remove(target_path)
                 self.logger.debug(f"Removed symlink: {target_path}")
-            elif os.path.isfile(target_path):
+            elif stat.S_ISREG(target_mode):
                 os.remove(target_path)
                 self.logger.debug(f"Removed file: {target_path}")
             else:
@@ -465,10 +709,10 @@ class FileOperationsManager:
             current_dir = directory_path
             
             while current_dir and current_dir != '/':
-                if os.path.exists(current_dir) and os.path.isdir(current_dir):
+                if os.path.isdir(current_dir):
                     try:
                         # Only remove if directory is empty
-                        if not os.listdir(current_dir):
+                        if _is_empty_dir(current_dir):
                             os.rmdir(current_dir)
                             self.logger.debug(f"Removed empty directory: {current_dir}")
                             current_dir = os.path.dirname(current_dir)
@@ -14,10 +14,68 @@ Provides consistent installation state information across all installer componen
 
 import os
 import json
+import mmap
 import re
-from typing import Dict, List, Optional, Any
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Any, Set, Tuple
 from datetime import datetime
+from enum import IntEnum
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Upper bound on tabs inspected concurrently; the work is stat/read latency, not CPU
+MAX_INSPECTION_WORKERS = 8
+
+# Blueprint identifiers appended to backend/__init__.py by the installer. Compiled
+# with google-re2 when it is installed (linear-time, no backtracking); new scans of
+# the same file should join this pattern as alternatives rather than re-read it.
+_BLUEPRINT_IDENTIFIER_LITERAL = '# PREMIUM_TAB_IDENTIFIER: '
+_BLUEPRINT_IDENTIFIER_RE = (re2 or re).compile(re.escape(_BLUEPRINT_IDENTIFIER_LITERAL) + r'(\w+)')
+
+
+def _entry_names(path: str) -> Set[str]:
+    """Names in a directory from one scandir; empty if it is missing or unreadable."""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except OSError:
+        return set()
+
+
+def _count_visible_files(path: str) -> int:
+    """
+    Count non-hidden files under path, skipping hidden directories.
+    
+    Same result as the os.walk loop it replaces (symlinked directories are
+    neither counted nor followed) but uses each DirEntry's cached type.
+    """
+    count = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if not entry.is_dir():
+                        count += 1
+                    elif not entry.is_symlink():
+                        stack.append(entry.path)
+        except OSError:
+            continue
+    return count
+
+
+class InstallationStatus(IntEnum):
+    """Installation state of a tab; values index the summary counters."""
+    COMPLETE = 0
+    INCOMPLETE = 1
+    BROKEN = 2
 
 
 class InstallationTracker:
@@ -33,143 +91,280 @@ class InstallationTracker:
         self.frontend_tablets_path = frontend_tablets_path
         self.backend_modules_path = backend_modules_path
         self.premium_dir_path = premium_dir_path
+        
+        # (fingerprint, tabs) from the last full scan; see get_installed_premium_tabs
+        self._cache: Optional[Tuple[Tuple, List[Dict[str, Any]]]] = None
+        
+        # (stat key, tab names) for the last parse of backend __init__.py
+        self._blueprint_cache: Optional[Tuple[Tuple, frozenset]] = None
+    
+    def invalidate(self) -> None:
+        """Drop the cached scan so the next query re-reads the filesystem."""
+        self._cache = None
+        self._blueprint_cache = None
+    
+    def _fingerprint(self) -> Tuple:
+        """
+        Cheap change marker for the scan inputs: one stat per root path.
+        
+        Installing or removing a tab rewrites __init__.py and adds or removes
+        entries in the tablets/backend/premium roots, all of which show up here.
+        """
+        fingerprint = []
+        for path in (self.backend_init_path, self.frontend_tablets_path,
+                     self.backend_modules_path, self.premium_dir_path):
+            try:
+                st = os.stat(path)
+                fingerprint.append((st.st_ino, st.st_mtime_ns, st.st_size, st.st_nlink))
+            except OSError:
+                fingerprint.append(None)
+        return tuple(fingerprint)
     
     def get_installed_premium_tabs(self) -> List[Dict[str, Any]]:
-        """Get detailed information about currently installed premium tabs by checking actual installation."""
-        installed_tabs = []
+        """
+        Get detailed information about currently installed premium tabs by checking actual installation.
+        
+        The result is reused while the root paths are unchanged, so back-to-back
+        queries (summary, validation, lookups) scan once. Call invalidate() after
+        changing a tab's files in place.
+        """
+        return list(self._iter_installed_premium_tabs())
+    
+    def _iter_installed_premium_tabs(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield installed tabs in name order: from the cache when it is current,
+        otherwise as the scan produces them. Only a fully consumed scan is cached.
+        """
+        fingerprint = self._fingerprint()
+        if self._cache is not None and self._cache[0] == fingerprint:
+            for tab in self._cache[1]:
+                yield dict(tab)
+            return
+        
+        tabs = []
+        for tab in self._scan_installed_premium_tabs():
+            tabs.append(tab)
+            yield dict(tab)
+        self._cache = (fingerprint, tabs)
+    
+    def _cached_tabs(self) -> Optional[List[Dict[str, Any]]]:
+        """The cached scan if it is still current, else None (never triggers a scan)."""
+        if self._cache is not None and self._cache[0] == self._fingerprint():
+            return self._cache[1]
+        return None
+    
+    def _single_tab_blueprint(self, tab_name: str) -> Optional[bool]:
+        """
+        Whether one tab's blueprint is registered, or None if a full scan would not
+        report it as installed. Touches only that tab's paths.
+        """
+        if not tab_name or '/' in tab_name or tab_name.startswith('.'):
+            return None
         
-        # First, check for tabs that have blueprint registrations
-        blueprint_tabs = self._get_blueprint_registered_tabs()
+        frontend_path = f"{self.frontend_tablets_path}/{tab_name}"
+        backend_path = f"{self.backend_modules_path}/{tab_name}"
+        if not (os.path.exists(frontend_path) and os.path.exists(backend_path)):
+            return None
         
-        # Then, check for tabs that exist in filesystem but might not have blueprints
-        filesystem_tabs = self._get_filesystem_installed_tabs()
+        if tab_name in self._get_blueprint_tab_names():
+            return True
+        names = _entry_names(frontend_path)
+        if "index.tsx" in names and "index.json" in names:
+            return False
+        return None
+    
+    def _scan_installed_premium_tabs(self) -> Iterator[Dict[str, Any]]:
+        """Walk the filesystem and yield the installed tabs in name order."""
+        # Blueprint registrations and filesystem-only installs come out of one
+        # pass over the frontend tablets directory
+        blueprint_names = self._get_blueprint_tab_names()
+        all_tab_names = self._discover_installed_tab_names(blueprint_names)
+        
+        # One listing of the premium root serves every tab's source lookup
+        premium_sources = self._index_premium_directories()
+        
+        def inspect(tab_name: str) -> Optional[Dict[str, Any]]:
+            return self._inspect_tab(tab_name, tab_name in blueprint_names, premium_sources)
+        
+        # Each tab is a handful of independent stats and small reads; overlap them
+        if len(all_tab_names) > 1:
+            executor = ThreadPoolExecutor(max_workers=min(MAX_INSPECTION_WORKERS, len(all_tab_names)))
+            try:
+                results = executor.map(inspect, all_tab_names)
+                yield from (tab for tab in results if tab is not None)
+            finally:
+                # A caller that stops early should not wait on tabs it will never read
+                executor.shutdown(wait=True, cancel_futures=True)
+        else:
+            results = (inspect(tab_name) for tab_name in all_tab_names)
+            yield from (tab for tab in results if tab is not None)
+    
+    def _inspect_tab(self, tab_name: str, has_blueprint: bool,
+                     premium_sources: Dict[str, List[str]]) -> Optional[Dict[str, Any]]:
+        """Build the installed-tab record for one tab, or None if it is not actually installed."""
+        # Check if this is actually a complete installation (tab names are single
+        # path components here, so plain formatting stands in for os.path.join)
+        frontend_path = f"{self.frontend_tablets_path}/{tab_name}"
+        backend_path = f"{self.backend_modules_path}/{tab_name}"
+        
+        # One stat of the frontend directory answers both "exists" and the install time
+        try:
+            frontend_stat = os.stat(frontend_path)
+        except OSError:
+            return None
+        if not os.path.exists(backend_path):
+            return None
         
-        # Combine both sets, prioritizing blueprint registrations
-        all_tab_names = set(blueprint_tabs.keys()) | set(filesystem_tabs.keys())
+        # Get tab info from premium directory if available
+        premium_path = self._find_premium_tab_directory(tab_name, premium_sources)
+        version = "unknown"
+        description = ""
         
-        for tab_name in sorted(all_tab_names):
-            # Get info from blueprint registration if available
-            blueprint_info = blueprint_tabs.get(tab_name, {})
-            filesystem_info = filesystem_tabs.get(tab_name, {})
-            
-            # Merge information, prioritizing blueprint data
-            tab_info = {**filesystem_info, **blueprint_info}
-            tab_info["name"] = tab_name
-            
-            # Check if this is actually a complete installation
-            frontend_path = os.path.join(self.frontend_tablets_path, tab_name)
-            backend_path = os.path.join(self.backend_modules_path, tab_name)
-            
-            if os.path.exists(frontend_path) and os.path.exists(backend_path):
-                # Get tab info from premium directory if available
-                premium_path = self._find_premium_tab_directory(tab_name)
-                version = tab_info.get("version", "unknown")
-                description = tab_info.get("description", "")
-                
-                if premium_path:
-                    try:
-                        with open(os.path.join(premium_path, "index.json"), 'r') as f:
-                            premium_info = json.load(f)
-                        version = premium_info.get("version", version)
-                        description = premium_info.get("description", description)
-                    except Exception:
-                        pass
-                
-                # Get installation timestamp from frontend directory
-                install_time = None
-                if os.path.exists(frontend_path):
-                    install_time = datetime.fromtimestamp(os.path.getctime(frontend_path)).isoformat()
-                
-                # Check installation completeness
-                installation_status = self._check_installation_completeness(tab_name, frontend_path, backend_path)
-                
-                # Check if blueprint is registered
-                has_blueprint = tab_name in blueprint_tabs
-                
-                installed_tabs.append({
-                    "name": tab_name,
-                    "version": version,
-                    "description": description,
-                    "frontend_path": frontend_path,
-                    "backend_path": backend_path,
-                    "premium_path": premium_path,
-                    "install_time": install_time,
-                    "status": installation_status,
-                    "has_blueprint": has_blueprint,
-                    "completeness": self._calculate_installation_completeness(tab_name, frontend_path, backend_path)
-                })
-        
-        return installed_tabs
+        if premium_path:
+            try:
+                with open(f"{premium_path}/index.json", 'r') as f:
+                    premium_info = json.load(f)
+                version = premium_info.get("version", version)
+                description = premium_info.get("description", description)
+            except Exception:
+                pass
+        
+        # Get installation timestamp from frontend directory
+        install_time = datetime.fromtimestamp(frontend_stat.st_ctime).isoformat()
+        
+        # Check installation completeness
+        # List each directory once; both completeness checks answer from these sets
+        frontend_names = _entry_names(frontend_path)
+        backend_names = _entry_names(backend_path)
+        state, installation_status = self._check_installation_completeness(
+            tab_name, frontend_path, backend_path, frontend_names, backend_names)
+        
+        return {
+            "name": tab_name,
+            "version": version,
+            "description": description,
+            "frontend_path": frontend_path,
+            "backend_path": backend_path,
+            "premium_path": premium_path,
+            "install_time": install_time,
+            "status": installation_status,
+            "state": state,
+            "has_blueprint": has_blueprint,
+            "completeness": self._calculate_installation_completeness(
+                tab_name, frontend_path, backend_path, frontend_names, backend_names)
+        }
     
-    def _get_blueprint_registered_tabs(self) -> Dict[str, Dict[str, Any]]:
-        """Get tabs that have blueprint registrations in backend __init__.py."""
-        blueprint_tabs = {}
+    def _get_blueprint_tab_names(self) -> frozenset:
+        """Names registered in backend __init__.py, re-parsed only when the file changes."""
+        try:
+            st = os.stat(self.backend_init_path)
+        except FileNotFoundError:
+            return frozenset()
+        except Exception as e:
+            self.logger.warning(f"Error reading backend __init__.py: {str(e)}")
+            return frozenset()
         
-        if os.path.exists(self.backend_init_path):
-            try:
-                with open(self.backend_init_path, 'r') as f:
-                    content = f.read()
-                
-                # Find all registered premium tab blueprints
-                blueprint_pattern = r'# PREMIUM_TAB_IDENTIFIER: (\w+)'
-                matches = re.findall(blueprint_pattern, content)
-                
-                for tab_name in matches:
-                    blueprint_tabs[tab_name] = {
-                        "blueprint_registered": True,
-                        "source": "blueprint"
-                    }
-                    
-            except Exception as e:
-                self.logger.warning(f"Error reading backend __init__.py: {str(e)}")
-        
-        return blueprint_tabs
+        stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if self._blueprint_cache is not None and self._blueprint_cache[0] == stat_key:
+            return self._blueprint_cache[1]
+        
+        try:
+            with open(self.backend_init_path, 'r') as f:
+                content = f.read()
+            
+            # Find all registered premium tab blueprints; a plain substring test
+            # settles the common no-premium-tabs case without running the regex
+            if _BLUEPRINT_IDENTIFIER_LITERAL in content:
+                tab_names = frozenset(m.group(1) for m in _BLUEPRINT_IDENTIFIER_RE.finditer(content))
+            else:
+                tab_names = frozenset()
+        except Exception as e:
+            self.logger.warning(f"Error reading backend __init__.py: {str(e)}")
+            return frozenset()
+        
+        self._blueprint_cache = (stat_key, tab_names)
+        return tab_names
     
-    def _get_filesystem_installed_tabs(self) -> Dict[str, Dict[str, Any]]:
-        """Get tabs that exist in filesystem but might not have blueprint registrations."""
-        filesystem_tabs = {}
-        
-        # Check frontend tablets directory
-        if os.path.exists(self.frontend_tablets_path):
-            for item in os.listdir(self.frontend_tablets_path):
-                item_path = os.path.join(self.frontend_tablets_path, item)
-                if os.path.isdir(item_path) and not item.startswith('.'):
-                    # Check if this looks like a premium tab (has index.tsx and index.json)
-                    if (os.path.exists(os.path.join(item_path, "index.tsx")) and 
-                        os.path.exists(os.path.join(item_path, "index.json"))):
-                        
-                        # Check if corresponding backend exists
-                        backend_path = os.path.join(self.backend_modules_path, item)
-                        if os.path.exists(backend_path):
-                            filesystem_tabs[item] = {
-                                "blueprint_registered": False,
-                                "source": "filesystem",
-                                "version": "unknown",
-                                "description": ""
-                            }
-        
-        return filesystem_tabs
+    def _discover_installed_tab_names(self, blueprint_names: frozenset) -> List[str]:
+        """
+        Sorted names of installed tab candidates: anything in the frontend tablets
+        directory with a registered blueprint, plus directories that look like premium
+        tabs without one. Blueprint names with no frontend entry are not installed.
+        """
+        try:
+            with os.scandir(self.frontend_tablets_path) as entries:
+                entries = list(entries)
+        except OSError:
+            return []
+        
+        tab_names = []
+        backend_names = None
+        for entry in entries:
+            if entry.name in blueprint_names:
+                tab_names.append(entry.name)
+                continue
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            # Check if this looks like a premium tab (has index.tsx and index.json)
+            # with a corresponding backend; one listing of the backend root answers
+            # every "does the backend exist" question
+            if backend_names is None:
+                backend_names = _entry_names(self.backend_modules_path)
+            if entry.name not in backend_names:
+                continue
+            names = _entry_names(entry.path)
+            if "index.tsx" in names and "index.json" in names:
+                tab_names.append(entry.name)
+        
+        tab_names.sort()
+        return tab_names
+    
+    def _index_premium_directories(self) -> Dict[str, List[str]]:
+        """
+        Map each tab name to the premium directories that may hold its source,
+        best match first, from one scandir of the premium root.
+        
+        Common patterns: tabName, tabNameTab, tabName_tab. A directory is indexed
+        under its own name and under the name with either suffix stripped; an
+        exact name match ranks ahead of a "Tab" match, which ranks ahead of "_tab".
+        """
+        try:
+            with os.scandir(self.premium_dir_path) as entries:
+                directories = [(entry.name, entry.path) for entry in entries if entry.is_dir()]
+        except OSError:
+            return {}
+        
+        ranked: Dict[str, List[Tuple[int, str]]] = {}
+        for name, path in directories:
+            ranked.setdefault(name, []).append((0, path))
+            for rank, suffix in ((1, "Tab"), (2, "_tab")):
+                if name.endswith(suffix) and len(name) > len(suffix):
+                    ranked.setdefault(name[:-len(suffix)], []).append((rank, path))
+        
+        return {tab_name: [path for _, path in sorted(candidates)]
+                for tab_name, candidates in ranked.items()}
     
-    def _find_premium_tab_directory(self, tab_name: str) -> Optional[str]:
+    def _find_premium_tab_directory(self, tab_name: str,
+                                    premium_sources: Optional[Dict[str, List[str]]] = None) -> Optional[str]:
         """Find the premium tab directory that corresponds to an installed tab name."""
-        if not os.path.exists(self.premium_dir_path):
-            return None
-        
-        # Look for directories that might contain this tab
-        # Common patterns: tabName, tabNameTab, etc.
-        possible_names = [tab_name, f"{tab_name}Tab", f"{tab_name}_tab"]
+        if premium_sources is None:
+            premium_sources = self._index_premium_directories()
         
-        for possible_name in possible_names:
-            possible_path = os.path.join(self.premium_dir_path, possible_name)
-            if os.path.exists(possible_path) and os.path.isdir(possible_path):
-                # Verify it has an index.json
-                if os.path.exists(os.path.join(possible_path, "index.json")):
-                    return possible_path
+        for possible_path in premium_sources.get(tab_name, ()):
+            # Verify it has an index.json
+            if os.path.exists(f"{possible_path}/index.json"):
+                return possible_path
         
         return None
     
-    def _check_installation_completeness(self, tab_name: str, frontend_path: str, backend_path: str) -> str:
-        """Check if a tab installation is complete and functional."""
+    def _check_installation_completeness(self, tab_name: str, frontend_path: str, backend_path: str,
+                                         frontend_names: Optional[Set[str]] = None,
+                                         backend_names: Optional[Set[str]] = None) -> Tuple[InstallationStatus, str]:
+        """
+        Check if a tab installation is complete and functional; returns (state, detail).
+        
+        frontend_names/backend_names are the directories' listings when the caller already has them.
+        """
         # Check for essential files
         essential_frontend = ["index.tsx", "index.json"]
         essential_backend = ["__init__.py", "routes.py"]
@@ -177,42 +372,49 @@ class InstallationTracker:
         missing_files = []
         
         # Check frontend files
+        if frontend_names is None:
+            frontend_names = _entry_names(frontend_path)
         for file_name in essential_frontend:
-            if not os.path.exists(os.path.join(frontend_path, file_name)):
+            if file_name not in frontend_names:
                 missing_files.append(f"frontend/{file_name}")
         
         # Check backend files
+        if backend_names is None:
+            backend_names = _entry_names(backend_path)
         for file_name in essential_backend:
-            if not os.path.exists(os.path.join(backend_path, file_name)):
+            if file_name not in backend_names:
                 missing_files.append(f"backend/{file_name}")
         
         if missing_files:
-            return f"incomplete (missing: {', '.join(missing_files)})"
+            return InstallationStatus.INCOMPLETE, f"incomplete (missing: {', '.join(missing_files)})"
         
         # Check if backend module can be imported
         if not self._check_backend_module_importable(tab_name, backend_path):
-            return "broken (backend import failed)"
+            return InstallationStatus.BROKEN, "broken (backend import failed)"
         
-        return "complete"
+        return InstallationStatus.COMPLETE, "complete"
     
     def _check_backend_module_importable(self, tab_name: str, backend_path: str) -> bool:
         """Check if the backend module can be imported without errors."""
         try:
             # Check if __init__.py exists and has basic structure
-            init_file = os.path.join(backend_path, "__init__.py")
+            init_file = f"{backend_path}/__init__.py"
             if not os.path.exists(init_file):
                 return False
             
             # Check if routes.py exists and has basic structure
-            routes_file = os.path.join(backend_path, "routes.py")
+            routes_file = f"{backend_path}/routes.py"
             if not os.path.exists(routes_file):
                 return False
             
-            # Basic validation - check for blueprint definition
-            with open(routes_file, 'r') as f:
-                content = f.read()
-                if 'bp = Blueprint(' not in content and 'Blueprint(' not in content:
+            # Basic validation - check for blueprint definition, searching the
+            # mapped file directly instead of decoding it into a str
+            with open(routes_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
                     return False
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if mapped.find(b'Blueprint(') == -1:
+                        return False
             
             return True
             
@@ -220,7 +422,9 @@ class InstallationTracker:
             self.logger.debug(f"Backend module validation failed for {tab_name}: {str(e)}")
             return False
     
-    def _calculate_installation_completeness(self, tab_name: str, frontend_path: str, backend_path: str) -> Dict[str, Any]:
+    def _calculate_installation_completeness(self, tab_name: str, frontend_path: str, backend_path: str,
+                                             frontend_names: Optional[Set[str]] = None,
+                                             backend_names: Optional[Set[str]] = None) -> Dict[str, Any]:
         """Calculate detailed installation completeness metrics."""
         completeness = {
             "frontend_files": 0,
@@ -230,25 +434,10 @@ class InstallationTracker:
             "warnings": []
         }
         
-        # Count frontend files
-        if os.path.exists(frontend_path):
-            for root, dirs, files in os.walk(frontend_path):
-                # Skip hidden directories
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-                for file in files:
-                    if not file.startswith('.'):
-                        completeness["frontend_files"] += 1
-                        completeness["total_files"] += 1
-        
-        # Count backend files
-        if os.path.exists(backend_path):
-            for root, dirs, files in os.walk(backend_path):
-                # Skip hidden directories
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-                for file in files:
-                    if not file.startswith('.'):
-                        completeness["backend_files"] += 1
-                        completeness["total_files"] += 1
+        # Count frontend and backend files
+        completeness["frontend_files"] = _count_visible_files(frontend_path)
+        completeness["backend_files"] = _count_visible_files(backend_path)
+        completeness["total_files"] = completeness["frontend_files"] + completeness["backend_files"]
         
         # Check for critical missing files
         critical_files = {
@@ -257,9 +446,12 @@ class InstallationTracker:
         }
         
         for category, files in critical_files.items():
+            if category == "frontend":
+                names = frontend_names if frontend_names is not None else _entry_names(frontend_path)
+            else:
+                names = backend_names if backend_names is not None else _entry_names(backend_path)
             for file_name in files:
-                file_path = os.path.join(frontend_path if category == "frontend" else backend_path, file_name)
-                if not os.path.exists(file_path):
+                if file_name not in names:
                     completeness["missing_critical"].append(f"{category}/{file_name}")
         
         # Check for warnings
@@ -274,48 +466,43 @@ class InstallationTracker:
         """Get a summary of all premium tab installations."""
         installed_tabs = self.get_installed_premium_tabs()
         
+        counts = Counter(tab["state"] for tab in installed_tabs)
+        
         summary = {
             "total_installed": len(installed_tabs),
-            "complete_installations": 0,
-            "incomplete_installations": 0,
-            "broken_installations": 0,
+            "complete_installations": counts[InstallationStatus.COMPLETE],
+            "incomplete_installations": counts[InstallationStatus.INCOMPLETE],
+            "broken_installations": counts[InstallationStatus.BROKEN],
             "tabs": installed_tabs
         }
         
-        for tab in installed_tabs:
-            status = tab.get("status", "unknown")
-            if "complete" in status:
-                summary["complete_installations"] += 1
-            elif "incomplete" in status:
-                summary["incomplete_installations"] += 1
-            elif "broken" in status:
-                summary["broken_installations"] += 1
-        
         return summary
     
     def is_tab_installed(self, tab_name: str) -> bool:
         """Check if a specific tab is installed."""
-        installed_tabs = self.get_installed_premium_tabs()
-        return any(tab["name"] == tab_name for tab in installed_tabs)
+        installed_tabs = self._cached_tabs()
+        if installed_tabs is not None:
+            return any(tab["name"] == tab_name for tab in installed_tabs)
+        return self._single_tab_blueprint(tab_name) is not None
     
     def get_tab_installation_info(self, tab_name: str) -> Optional[Dict[str, Any]]:
         """Get detailed installation info for a specific tab."""
-        installed_tabs = self.get_installed_premium_tabs()
-        for tab in installed_tabs:
-            if tab["name"] == tab_name:
-                return tab
-        return None
+        installed_tabs = self._cached_tabs()
+        if installed_tabs is not None:
+            for tab in installed_tabs:
+                if tab["name"] == tab_name:
+                    return dict(tab)
+            return None
+        
+        # No current scan to consult: inspect just this tab
+        has_blueprint = self._single_tab_blueprint(tab_name)
+        if has_blueprint is None:
+            return None
+        return self._inspect_tab(tab_name, has_blueprint, self._index_premium_directories())
     
     def get_orphaned_installations(self) -> List[Dict[str, Any]]:
         """Find tabs that are installed but no longer have source in premium directory."""
-        installed_tabs = self.get_installed_premium_tabs()
-        orphaned = []
-        
-        for tab in installed_tabs:
-            if not tab.get("premium_path"):
-                orphaned.append(tab)
-        
-        return orphaned
+        return [tab for tab in self._iter_installed_premium_tabs() if not tab.get("premium_path")]
     
     def validate_installation_integrity(self) -> Dict[str, Any]:
         """Validate the integrity of all premium tab installations."""
@@ -327,15 +514,13 @@ class InstallationTracker:
         
         installed_tabs = self.get_installed_premium_tabs()
         
+        # Route each tab to its list with one lookup instead of an if/elif chain
+        bucket_for_state = {
+            InstallationStatus.COMPLETE: validation_results["valid"],
+            InstallationStatus.INCOMPLETE: validation_results["warnings"],
+            InstallationStatus.BROKEN: validation_results["invalid"],
+        }
         for tab in installed_tabs:
-            tab_name = tab["name"]
-            status = tab["status"]
-            
-            if "complete" in status:
-                validation_results["valid"].append(tab_name)
-            elif "broken" in status:
-                validation_results["invalid"].append(tab_name)
-            else:
-                validation_results["warnings"].append(tab_name)
+            bucket_for_state[tab["state"]].append(tab["name"])
         
         return validation_results
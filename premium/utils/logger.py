@@ -4,26 +4,98 @@ Premium Tab JSON Logger
 A dedicated logging system for premium tab operations that organizes logs by categories
 with timestamps and preserves logs across different operations.
 
+The log is JSON Lines: one record per line, appended as messages are written.
+  {"ts": "...", "cat": "install", "lvl": "info", "msg": "..."}
+  {"ts": "...", "cat": "install", "clear": true}
+A clear record starts a category over; readers rebuild the per-category view
+({category: {"last_updated", "messages"}}) with read_log_categories().
+
 Categories: install, uninstall, git, validate, batch_install, reinstall, batch_reinstall, restore_patches
 """
 
+import copy
 import json
 import os
+import stat
 import logging
+import tempfile
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from threading import Lock
+from typing import Dict, List, Any, Optional, Iterable
+from threading import Lock, Timer
 from pathlib import Path
 
+DEFAULT_LOG_FILE = "/var/log/homeserver/premium_installer.jsonl"
+
+# Logged messages reach the file at most this long after the first unwritten one
+FLUSH_DELAY_SECONDS = 0.25
+
+# Messages logged within this many seconds of each other share one formatted timestamp
+TIMESTAMP_RESOLUTION_SECONDS = 0.01
+
+# Past this size, a flush rewrites the file without records superseded by a clear.
+# Once a rewrite finds nothing to drop, further rewrites wait for a new clear record.
+LOG_COMPACT_BYTES = 1 << 20
+
+
+def read_log_categories(lines: Iterable[str], category: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Rebuild {category: {"last_updated", "messages"}} from JSON Lines records.
+    
+    With category given, lines for other categories are skipped by a substring
+    test before parsing. Unparseable lines (e.g. a torn final write) are ignored.
+    """
+    needle = f'"cat": {json.dumps(category)}' if category is not None else None
+    data: Dict[str, Dict[str, Any]] = {}
+    for line in lines:
+        if needle is not None and needle not in line:
+            continue
+        try:
+            _apply_record(data, json.loads(line))
+        except (ValueError, KeyError, TypeError):
+            continue
+    return data
+
+
+def _apply_record(data: Dict[str, Dict[str, Any]], record: Dict[str, Any]) -> None:
+    """Fold one log record into a per-category view."""
+    category = record["cat"]
+    if record.get("clear"):
+        data[category] = {"last_updated": record.get("ts"), "messages": []}
+        return
+    entry = data.setdefault(category, {"last_updated": None, "messages": []})
+    entry["last_updated"] = record.get("ts")
+    entry["messages"].append(f"{record.get('lvl')}: {record.get('msg')}")
+
 
 class PremiumJSONLogger:
     """JSON logger for premium tab operations with category-based organization."""
     
     VALID_CATEGORIES = {"install", "uninstall", "git", "validate", "batch_install", "reinstall", "batch_reinstall", "restore_patches"}
     
-    def __init__(self, log_file: str = "/var/log/homeserver/premium_installer.log"):
+    # Per log file: lock, pending records, the armed flush timer, the
+    # per-category view (None until first needed) and whether compaction is
+    # stalled (the last rewrite dropped nothing and no clear was written since). Shared so every logger in
+    # the process writing the same file buffers into one ordered queue.
+    #
+    # The installer process owns the log: the view is read from the file once
+    # and then kept current in memory, so reads never re-parse it. Records
+    # other processes append later are in the file but not in the view, which
+    # is why clears are always written rather than decided from the view.
+    _shared: Dict[str, Dict[str, Any]] = {}
+    _shared_lock = Lock()
+    
+    # (time.time(), isoformat of it) for the most recent timestamp; see _now
+    _ts_cache = (0.0, "")
+    
+    def __init__(self, log_file: str = DEFAULT_LOG_FILE):
         self.log_file = log_file
-        self.lock = Lock()
+        with PremiumJSONLogger._shared_lock:
+            self._state = PremiumJSONLogger._shared.setdefault(
+                log_file, {"lock": Lock(), "pending": [], "timer": None, "view": None,
+                           "compact_stalled": False}
+            )
+        self.lock = self._state["lock"]
         
         # Ensure log directory exists
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
@@ -32,18 +104,10 @@ class PremiumJSONLogger:
         self._initialize_log_structure()
     
     def _initialize_log_structure(self) -> None:
-        """Initialize the JSON log structure if it doesn't exist."""
+        """Create the (empty) log file if it doesn't exist."""
         if not os.path.exists(self.log_file):
-            initial_structure = {
-                category: {
-                    "last_updated": None,
-                    "messages": []
-                }
-                for category in self.VALID_CATEGORIES
-            }
-            
-            with open(self.log_file, 'w') as f:
-                json.dump(initial_structure, f, indent=2)
+            with open(self.log_file, 'a'):
+                pass
     
     def _default_log_structure(self) -> Dict[str, Any]:
         """Return a fresh in-memory log structure (no file I/O)."""
@@ -51,66 +115,168 @@ class PremiumJSONLogger:
             category: {"last_updated": None, "messages": []}
             for category in self.VALID_CATEGORIES
         }
-
+    
     def _load_log_data(self) -> Dict[str, Any]:
-        """Load current log data from file. On corrupt/missing file, reinit once and retry; never recurse."""
+        """Rebuild the per-category view from the log file in one streaming pass."""
+        data = self._default_log_structure()
         try:
             with open(self.log_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            # Corrupt or missing: remove so _initialize_log_structure overwrites, then one retry
+                data.update(read_log_categories(f))
+        except FileNotFoundError:
+            pass
+        return data
+    
+    def _view(self) -> Dict[str, Any]:
+        """The in-memory per-category view, loaded on first use; caller holds the lock."""
+        if self._state["view"] is None:
+            view = self._load_log_data()
+            # Queued records are not in the file yet
+            for record in self._state["pending"]:
+                _apply_record(view, record)
+            self._state["view"] = view
+        return self._state["view"]
+    
+    def _compact(self) -> bool:
+        """
+        Rewrite the log keeping only records after each category's last clear.
+        
+        Returns whether the rewrite dropped anything.
+        """
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        
+        last_clear: Dict[str, int] = {}
+        categories: List[Optional[str]] = []
+        for index, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+                categories.append(record["cat"])
+                if record.get("clear"):
+                    last_clear[record["cat"]] = index
+            except (ValueError, KeyError, TypeError):
+                categories.append(None)
+        
+        kept = [line for index, (line, category) in enumerate(zip(lines, categories))
+                if category is not None and index >= last_clear.get(category, 0)]
+        if len(kept) == len(lines):
+            return False
+        
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.log_file) or '.',
+                                             prefix='.premium_installer.', suffix='.tmp')
+        except OSError:
+            # Log directory not writable by this process (e.g. the web backend); leave it to the installer
+            return False
+        
+        try:
+            # Keep the existing file's mode and owner so other readers keep access
+            file_stat = os.stat(self.log_file)
+            os.fchmod(fd, stat.S_IMODE(file_stat.st_mode))
             try:
-                if os.path.exists(self.log_file):
-                    os.remove(self.log_file)
+                os.fchown(fd, file_stat.st_uid, file_stat.st_gid)
+            except PermissionError:
+                pass
+            
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.writelines(kept)
+            os.replace(temp_path, self.log_file)
+            return True
+        except BaseException:
+            try:
+                os.unlink(temp_path)
             except OSError:
                 pass
-            self._initialize_log_structure()
+            raise
+    
+    @classmethod
+    def _now(cls) -> str:
+        """ISO timestamp, reformatted only when TIMESTAMP_RESOLUTION_SECONDS have passed."""
+        now = time.time()
+        cached_at, formatted = cls._ts_cache
+        if now - cached_at > TIMESTAMP_RESOLUTION_SECONDS:
+            formatted = datetime.fromtimestamp(now).isoformat()
+            cls._ts_cache = (now, formatted)
+        return formatted
+    
+    def _enqueue(self, record: Dict[str, Any]) -> None:
+        """Queue a record and arm the debounced flush."""
+        record = {"ts": self._now(), **record}
+        with self.lock:
+            if self._state["view"] is not None:
+                _apply_record(self._state["view"], record)
+            self._state["pending"].append(record)
+            if self._state["timer"] is None:
+                timer = Timer(FLUSH_DELAY_SECONDS, self._flush_from_timer)
+                self._state["timer"] = timer
+                timer.start()
+    
+    def _flush_from_timer(self) -> None:
+        """Timer callback: logging must never raise into the caller's thread."""
+        try:
+            self.flush()
+        except Exception:
+            pass
+    
+    def flush(self) -> None:
+        """Append all queued records to the log file with a single write."""
+        with self.lock:
+            timer = self._state["timer"]
+            if timer is not None:
+                timer.cancel()
+                self._state["timer"] = None
+            
+            pending: List[Dict[str, Any]] = self._state["pending"]
+            if not pending:
+                return
+            self._state["pending"] = []
+            
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(record) + '\n' for record in pending))
+                size = f.tell()
+            
+            # Rewriting is only worth it if it can drop something: after a rewrite
+            # that dropped nothing, wait until a new clear record has been written
+            if any(record.get("clear") for record in pending):
+                self._state["compact_stalled"] = False
+            if size > LOG_COMPACT_BYTES and not self._state["compact_stalled"]:
+                self._state["compact_stalled"] = not self._compact()
+    
+    def close(self) -> None:
+        """Flush anything still queued and fsync the log; the logger stays usable afterwards."""
+        self.flush()
+        with self.lock:
             try:
-                with open(self.log_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return self._default_log_structure()
-
-        # Ensure all categories exist
-        for category in self.VALID_CATEGORIES:
-            if category not in data:
-                data[category] = {
-                    "last_updated": None,
-                    "messages": []
-                }
-        return data
+                fd = os.open(self.log_file, os.O_RDONLY)
+            except FileNotFoundError:
+                return
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
     
-    def _save_log_data(self, data: Dict[str, Any]) -> None:
-        """Save log data to file."""
-        with open(self.log_file, 'w') as f:
-            json.dump(data, f, indent=2)
+    @classmethod
+    def close_all(cls) -> None:
+        """Close every log file written through this process; call once before exiting."""
+        with cls._shared_lock:
+            log_files = list(cls._shared)
+        for log_file in log_files:
+            cls(log_file).close()
     
     def clear_category(self, category: str) -> None:
         """Clear logs for a specific category."""
         if category not in self.VALID_CATEGORIES:
             raise ValueError(f"Invalid category: {category}. Must be one of {self.VALID_CATEGORIES}")
         
-        with self.lock:
-            data = self._load_log_data()
-            data[category] = {
-                "last_updated": datetime.now().isoformat(),
-                "messages": []
-            }
-            self._save_log_data(data)
+        # Always written: other processes may have appended records this
+        # process's view has not seen
+        self._enqueue({"cat": category, "clear": True})
     
     def log_message(self, category: str, level: str, message: str) -> None:
-        """Log a message to a specific category."""
+        """Log a message to a specific category; written out within FLUSH_DELAY_SECONDS."""
         if category not in self.VALID_CATEGORIES:
             raise ValueError(f"Invalid category: {category}. Must be one of {self.VALID_CATEGORIES}")
         
-        with self.lock:
-            data = self._load_log_data()
-            
-            # Update timestamp and add message as simple string
-            data[category]["last_updated"] = datetime.now().isoformat()
-            data[category]["messages"].append(f"{level}: {message}")
-            
-            self._save_log_data(data)
+        self._enqueue({"cat": category, "lvl": level, "msg": message})
     
     def get_category_logs(self, category: str) -> Dict[str, Any]:
         """Get logs for a specific category."""
@@ -118,13 +284,12 @@ class PremiumJSONLogger:
             raise ValueError(f"Invalid category: {category}. Must be one of {self.VALID_CATEGORIES}")
         
         with self.lock:
-            data = self._load_log_data()
-            return data.get(category, {"last_updated": None, "messages": []})
+            return copy.deepcopy(self._view()[category])
     
     def get_all_logs(self) -> Dict[str, Any]:
         """Get all logs."""
         with self.lock:
-            return self._load_log_data()
+            return copy.deepcopy(self._view())
 
 
 class CategoryLogger:
@@ -146,33 +311,41 @@ class CategoryLogger:
         """Check if this log level should be written to JSON."""
         return level >= self.json_level
     
-    def info(self, message: str) -> None:
+    def isEnabledFor(self, level: int) -> bool:
+        """Check if a message at this level would be emitted to console or JSON."""
+        return self.console_logger.isEnabledFor(level) or self._should_log_to_json(level)
+    
+    def _log(self, level: int, level_name: str, message: str, args: tuple) -> None:
+        """Forward to console with lazy %-formatting; format once for JSON only when needed."""
+        self.console_logger.log(level, message, *args)
+        if self._should_log_to_json(level):
+            self.json_logger.log_message(self.category, level_name, message % args if args else message)
+    
+    def info(self, message: str, *args) -> None:
         """Log an info message."""
-        self.console_logger.info(message)
-        if self._should_log_to_json(logging.INFO):
-            self.json_logger.log_message(self.category, "info", message)
+        self._log(logging.INFO, "info", message, args)
     
-    def error(self, message: str) -> None:
+    def error(self, message: str, *args) -> None:
         """Log an error message."""
-        self.console_logger.error(message)
+        self._log(logging.ERROR, "error", message, args)
+    
+    def exception(self, message: str, *args) -> None:
+        """Log an error message with the current exception's traceback on the console."""
+        self.console_logger.exception(message, *args)
         if self._should_log_to_json(logging.ERROR):
-            self.json_logger.log_message(self.category, "error", message)
+            self.json_logger.log_message(self.category, "error", message % args if args else message)
     
-    def warning(self, message: str) -> None:
+    def warning(self, message: str, *args) -> None:
         """Log a warning message."""
-        self.console_logger.warning(message)
-        if self._should_log_to_json(logging.WARNING):
-            self.json_logger.log_message(self.category, "warning", message)
+        self._log(logging.WARNING, "warning", message, args)
     
-    def debug(self, message: str) -> None:
+    def debug(self, message: str, *args) -> None:
         """Log a debug message."""
-        self.console_logger.debug(message)
-        if self._should_log_to_json(logging.DEBUG):
-            self.json_logger.log_message(self.category, "debug", message)
+        self._log(logging.DEBUG, "debug", message, args)
 
 
 def create_category_logger(category: str, console_logger: logging.Logger, 
-                          log_file: str = "/var/log/homeserver/premium_installer.log",
+                          log_file: str = DEFAULT_LOG_FILE,
                           json_level: str = "INFO") -> CategoryLogger:
     """Create a category logger for a specific operation."""
     json_logger = PremiumJSONLogger(log_file)
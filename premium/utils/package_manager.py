@@ -7,13 +7,69 @@ Provides atomic package operations with comprehensive tracking.
 """
 
 import os
+import sys
 import json
 import subprocess
 import shutil
 import platform
+import logging
+import functools
+import re
+from collections import deque
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Lines of streamed command output kept for error reporting
+STREAM_TAIL_LINES = 50
+
+# posix_spawn skips duplicating the interpreter's page tables that fork() pays for;
+# absent on some platforms, where queries go through subprocess instead
+_posix_spawnp = getattr(os, 'posix_spawnp', None)
+
+OS_RELEASE_PATH = "/etc/os-release"
+
+# Platform IDs grouped by package manager family
+_DEBIAN_FAMILY = frozenset({"debian", "ubuntu"})
+_RPM_FAMILY = frozenset({"rhel", "centos", "fedora"})
+
+# "name==version" requirement lines (optionally with extras); comment lines never match
+_PINNED_REQUIREMENT_RE = re.compile(
+    r'^[ \t]*([A-Za-z0-9][A-Za-z0-9._-]*(?:\[[^\]\n]*\])?)[ \t]*==[ \t]*([^\s;#,]*)', re.MULTILINE)
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to indent=2 JSON bytes, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+@functools.lru_cache(maxsize=1)
+def _load_os_release() -> Dict[str, str]:
+    """Parse /etc/os-release into a KEY -> value dict once per process."""
+    try:
+        with open(OS_RELEASE_PATH, 'r') as f:
+            text = f.read()
+    except OSError:
+        return {}
+    return {
+        key.strip(): value.strip().strip('"\'')
+        for key, sep, value in (line.partition('=') for line in text.splitlines())
+        if sep and not key.lstrip().startswith('#')
+    }
+
 
 @dataclass
 class PackageInstallationState:
@@ -53,14 +109,28 @@ class PackageManager:
         self.package_json_path = package_json_path
         self.installation_state = PackageInstallationState()
         self.supported_platforms = ["debian", "ubuntu"]  # Supported system platforms
+        self._platform_id: Optional[str] = None  # Detected once; the platform cannot change at runtime
+        self._package_manager_command: Optional[List[str]] = None
+        self._version_cache: Dict[str, Optional[str]] = {}  # package -> installed version (None if absent)
     
-    def _run_command(self, cmd: List[str], check: bool = True, capture_output: bool = True, cwd: str = None) -> subprocess.CompletedProcess:
-        """Run a command with logging."""
+    def _run_command(self, cmd: List[str], check: bool = True, capture_output: bool = True, cwd: str = None,
+                     stream_output: bool = False, stdout_to_log: bool = True) -> subprocess.CompletedProcess:
+        """Run a command with logging.
+        
+        With stream_output, stdout/stderr are merged and logged line by line as the command
+        runs instead of being buffered in memory; only the last lines are kept for errors.
+        With stream_output and stdout_to_log=False, the command inherits this process's
+        stdout; stderr is passed through and only its last lines are kept for errors.
+        """
         cmd_str = ' '.join(cmd)
         if cwd:
             self.logger.debug(f"Running command in {cwd}: {cmd_str}")
         else:
             self.logger.debug(f"Running command: {cmd_str}")
+        if stream_output and not stdout_to_log:
+            return self._run_inherited_command(cmd, cmd_str, check, cwd)
+        if stream_output:
+            return self._run_streaming_command(cmd, cmd_str, check, cwd)
         try:
             result = subprocess.run(cmd, check=check, capture_output=capture_output, text=True, cwd=cwd)
             if result.stdout:
@@ -71,16 +141,88 @@ class PackageManager:
             self.logger.error(f"Error: {e.stderr if e.stderr else str(e)}")
             raise
     
+    def _run_streaming_command(self, cmd: List[str], cmd_str: str, check: bool, cwd: str) -> subprocess.CompletedProcess:
+        """Run a command, streaming its combined output to the debug log."""
+        tail = deque(maxlen=STREAM_TAIL_LINES)
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              bufsize=1, text=True, cwd=cwd) as proc:
+            for line in proc.stdout:
+                line = line.rstrip()
+                tail.append(line)
+                self.logger.debug(line)
+            returncode = proc.wait()
+        
+        output = '\n'.join(tail)
+        if check and returncode != 0:
+            self.logger.error(f"Command failed: {cmd_str}")
+            self.logger.error(f"Error: {output or f'exit status {returncode}'}")
+            raise subprocess.CalledProcessError(returncode, cmd, output=output)
+        return subprocess.CompletedProcess(cmd, returncode, stdout=output)
+    
+    def _run_inherited_command(self, cmd: List[str], cmd_str: str, check: bool, cwd: str) -> subprocess.CompletedProcess:
+        """Run a command on this process's stdout, passing its stderr through and keeping the last lines for errors."""
+        tail = deque(maxlen=STREAM_TAIL_LINES)
+        with subprocess.Popen(cmd, stderr=subprocess.PIPE, bufsize=1, text=True, cwd=cwd) as proc:
+            for line in proc.stderr:
+                sys.stderr.write(line)
+                tail.append(line.rstrip())
+            returncode = proc.wait()
+        
+        errors = '\n'.join(tail)
+        if check and returncode != 0:
+            self.logger.error(f"Command failed: {cmd_str}")
+            self.logger.error(f"Error: {errors or f'exit status {returncode}'}")
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=errors)
+        return subprocess.CompletedProcess(cmd, returncode, stderr=errors)
+    
+    def _run_query(self, cmd: List[str]) -> subprocess.CompletedProcess:
+        """Run a short read-only query command and capture its stdout (stderr is discarded).
+        
+        Used for the package state lookups, which are issued often and never need
+        the error handling of _run_command; never raises on a non-zero exit.
+        """
+        self.logger.debug(f"Running query: {' '.join(cmd)}")
+        if _posix_spawnp is None:
+            return subprocess.run(cmd, check=False, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        
+        read_fd, write_fd = os.pipe()
+        try:
+            pid = _posix_spawnp(cmd[0], cmd, os.environ, file_actions=[
+                (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+                (os.POSIX_SPAWN_DUP2, write_fd, 1),
+                (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+            ])
+        except BaseException:
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+        
+        try:
+            with os.fdopen(read_fd, 'rb') as f:
+                output = f.read()
+        finally:
+            _, status = os.waitpid(pid, 0)
+        return subprocess.CompletedProcess(cmd, os.waitstatus_to_exitcode(status),
+                                           stdout=output.decode('utf-8', errors='replace'))
+    
+    def _log_install_output(self) -> bool:
+        """Whether package manager output would reach the log at all (it is logged at debug level)."""
+        return self.logger.isEnabledFor(logging.DEBUG)
+    
     def _detect_system_platform(self) -> str:
-        """Detect the current system platform."""
+        """Detect the current system platform (cached after the first call)."""
+        if self._platform_id is None:
+            self._platform_id = self._probe_system_platform()
+        return self._platform_id
+    
+    def _probe_system_platform(self) -> str:
+        """Detect the current system platform from /etc/os-release or distribution markers."""
         try:
             # Try to detect using /etc/os-release
-            if os.path.exists("/etc/os-release"):
-                with open("/etc/os-release", 'r') as f:
-                    for line in f:
-                        if line.startswith("ID="):
-                            platform_id = line.split("=")[1].strip().strip('"')
-                            return platform_id.lower()
+            platform_id = _load_os_release().get("ID")
+            if platform_id:
+                return platform_id.lower()
             
             # Fallback to platform module
             system = platform.system().lower()
@@ -99,62 +241,83 @@ class PackageManager:
             return "unknown"
     
     def _get_package_manager_command(self) -> List[str]:
-        """Get the appropriate package manager command for the current platform."""
-        platform_id = self._detect_system_platform()
-        
-        if platform_id in ["debian", "ubuntu"]:
-            return ["apt-get", "install", "-y"]
-        elif platform_id in ["rhel", "centos", "fedora"]:
-            return ["dnf", "install", "-y"]
-        elif platform_id == "arch":
-            return ["pacman", "-S", "--noconfirm"]
-        else:
-            raise ValueError(f"Unsupported platform: {platform_id}")
-    
-    def _is_package_installed(self, package_name: str) -> bool:
-        """Check if a system package is installed."""
-        platform_id = self._detect_system_platform()
+        """Get the appropriate package manager command for the current platform.
         
-        try:
-            if platform_id in ["debian", "ubuntu"]:
-                result = self._run_command(["dpkg", "-l", package_name], check=False)
-                return result.returncode == 0 and "ii" in result.stdout
-            elif platform_id in ["rhel", "centos", "fedora"]:
-                result = self._run_command(["rpm", "-q", package_name], check=False)
-                return result.returncode == 0
+        Returns a fresh list each call, since callers extend it with flags and targets.
+        """
+        if self._package_manager_command is None:
+            platform_id = self._detect_system_platform()
+            
+            if platform_id in _DEBIAN_FAMILY:
+                self._package_manager_command = ["apt-get", "install", "-y"]
+            elif platform_id in _RPM_FAMILY:
+                self._package_manager_command = ["dnf", "install", "-y"]
             elif platform_id == "arch":
-                result = self._run_command(["pacman", "-Q", package_name], check=False)
-                return result.returncode == 0
+                self._package_manager_command = ["pacman", "-S", "--noconfirm"]
             else:
-                self.logger.warning(f"Package check not supported for platform: {platform_id}")
-                return False
-        except Exception:
-            return False
+                raise ValueError(f"Unsupported platform: {platform_id}")
+        return list(self._package_manager_command)
     
-    def _get_installed_package_version(self, package_name: str) -> Optional[str]:
-        """Get the version of an installed system package."""
+    def _get_installed_packages_bulk(self, package_names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Query the installed state of several system packages with one subprocess.
+        
+        Returns a dict containing only the installed packages, mapped to their
+        version (None if the package manager did not report one).
+        """
+        names = list(dict.fromkeys(package_names))
+        if not names:
+            return {}
+        
         platform_id = self._detect_system_platform()
+        installed: Dict[str, Optional[str]] = {}
         
         try:
-            if platform_id in ["debian", "ubuntu"]:
-                result = self._run_command(["dpkg-query", "--showformat='${Version}'", "--show", package_name], check=False)
-                if result.returncode == 0:
-                    return result.stdout.strip().strip("'")
-            elif platform_id in ["rhel", "centos", "fedora"]:
-                result = self._run_command(["rpm", "-q", "--queryformat", "%{VERSION}-%{RELEASE}", package_name], check=False)
-                if result.returncode == 0:
-                    return result.stdout.strip()
+            if platform_id in _DEBIAN_FAMILY:
+                # Unknown names go to stderr with a non-zero exit; known ones are still listed
+                result = self._run_query(["dpkg-query", "-W", "-f=${Package}\t${Status}\t${Version}\n", *names])
+                for line in result.stdout.splitlines():
+                    parts = line.split('\t')
+                    # Status is "<want> <error> <state>"; only a fully installed state counts
+                    if len(parts) == 3 and parts[1].endswith(" installed"):
+                        installed[parts[0]] = parts[2] or None
+            elif platform_id in _RPM_FAMILY:
+                # Missing packages are reported as "package X is not installed" lines
+                result = self._run_query(["rpm", "-q", "--queryformat", "%{NAME}\t%{VERSION}-%{RELEASE}\n", *names])
+                for line in result.stdout.splitlines():
+                    parts = line.split('\t')
+                    if len(parts) == 2:
+                        installed[parts[0]] = parts[1] or None
             elif platform_id == "arch":
-                result = self._run_command(["pacman", "-Q", package_name], check=False)
-                if result.returncode == 0:
-                    # Output format: "package-name version-release"
-                    parts = result.stdout.strip().split()
+                # Output format: "package-name version-release"
+                result = self._run_query(["pacman", "-Q", *names])
+                for line in result.stdout.splitlines():
+                    parts = line.split()
                     if len(parts) >= 2:
-                        return parts[1]
-        except Exception:
-            pass
+                        installed[parts[0]] = parts[1]
+            else:
+                self.logger.warning(f"Package check not supported for platform: {platform_id}")
+                return {}
+        except Exception as e:
+            self.logger.debug(f"Package query failed: {str(e)}")
+            return {}
+        
+        # Remember what was seen so later version lookups skip the subprocess
+        for name in names:
+            self._version_cache[name] = installed.get(name)
         
-        return None
+        # Only report the names that were asked about
+        return {name: installed[name] for name in names if name in installed}
+    
+    def _is_package_installed(self, package_name: str) -> bool:
+        """Check if a system package is installed."""
+        return package_name in self._get_installed_packages_bulk([package_name])
+    
+    def _get_installed_package_version(self, package_name: str) -> Optional[str]:
+        """Get the version of an installed system package (cached until it is reinstalled or removed)."""
+        if package_name in self._version_cache:
+            return self._version_cache[package_name]
+        return self._get_installed_packages_bulk([package_name]).get(package_name)
     
     def load_system_dependencies(self, dependencies_file: str) -> Optional[SystemDependencies]:
         """Load system dependencies from dependencies.json file."""
@@ -163,8 +326,8 @@ class PackageManager:
             return None
         
         try:
-            with open(dependencies_file, 'r') as f:
-                data = json.load(f)
+            with open(dependencies_file, 'rb') as f:
+                data = _json_loads(f.read())
             
             # Parse packages
             packages = []
@@ -225,15 +388,21 @@ class PackageManager:
         if not system_deps:
             return conflicts
         
+        # One query answers every conflict check
+        installed = self._get_installed_packages_bulk(
+            system_deps.conflicts + [pkg for package in system_deps.packages for pkg in package.conflicts])
+        if not installed:
+            return conflicts
+        
         # Check global conflicts
         for conflict_pkg in system_deps.conflicts:
-            if self._is_package_installed(conflict_pkg):
+            if conflict_pkg in installed:
                 conflicts.append(f"Conflicting package installed: {conflict_pkg}")
         
         # Check per-package conflicts
         for package in system_deps.packages:
             for conflict_pkg in package.conflicts:
-                if self._is_package_installed(conflict_pkg):
+                if conflict_pkg in installed:
                     conflicts.append(f"Package {package.name} conflicts with installed package: {conflict_pkg}")
         
         return conflicts
@@ -258,30 +427,34 @@ class PackageManager:
             return False
         
         try:
+            # One query covers rollback tracking, the install-needed check and version checks
+            installed = self._get_installed_packages_bulk([package.name for package in system_deps.packages])
+            
             # Track current package states for rollback
             for package in system_deps.packages:
-                was_installed = self._is_package_installed(package.name)
+                was_installed = package.name in installed
                 self.installation_state.system_packages_state[package.name] = "installed" if was_installed else "not_installed"
             
             # Update package lists first
             self.logger.info("Updating package lists...")
             platform_id = self._detect_system_platform()
-            if platform_id in ["debian", "ubuntu"]:
+            if platform_id in _DEBIAN_FAMILY:
                 self._run_command(
-                    ["apt-get", "update", "--allow-releaseinfo-change"]
+                    ["apt-get", "update", "--allow-releaseinfo-change"], stream_output=True,
+                    stdout_to_log=self._log_install_output()
                 )
-            elif platform_id in ["rhel", "centos", "fedora"]:
+            elif platform_id in _RPM_FAMILY:
                 self._run_command(["dnf", "check-update"], check=False)  # check-update returns 100 if updates available
             
             # Install packages
             packages_to_install = []
             for package in system_deps.packages:
-                if not self._is_package_installed(package.name):
+                if package.name not in installed:
                     packages_to_install.append(package)
                 else:
                     # Package is installed - check if version satisfies requirement
                     if package.version:
-                        installed_version = self._get_installed_package_version(package.name)
+                        installed_version = installed[package.name]
                         if installed_version:
                             try:
                                 # Parse versions for comparison (use permissive parsing)
@@ -310,14 +483,23 @@ class PackageManager:
             if packages_to_install:
                 self.logger.info(f"Installing {len(packages_to_install)} system packages...")
                 
-                # Install packages with fallback mechanism for pinned versions
-                successfully_installed = []
+                # Packages sharing the same flags go through one package manager transaction;
+                # if that fails, fall back to per-package installs with pinned-version fallback
+                groups: Dict[Tuple[str, ...], List[SystemPackage]] = {}
                 for package in packages_to_install:
-                    if self._install_single_system_package(package, platform_id):
-                        successfully_installed.append(package.name)
-                    else:
-                        self.logger.error(f"Failed to install package: {package.name}")
-                        return False
+                    groups.setdefault(tuple(package.flags), []).append(package)
+                
+                successfully_installed = []
+                for group in groups.values():
+                    if len(group) > 1 and self._install_system_package_group(group, platform_id):
+                        successfully_installed.extend(package.name for package in group)
+                        continue
+                    for package in group:
+                        if self._install_single_system_package(package, platform_id):
+                            successfully_installed.append(package.name)
+                        else:
+                            self.logger.error(f"Failed to install package: {package.name}")
+                            return False
                 
                 # Track installed packages for rollback
                 if successfully_installed:
@@ -335,6 +517,38 @@ class PackageManager:
             self.logger.error(f"Failed to install system dependencies: {str(e)}")
             return False
     
+    def _install_system_package_group(self, packages: List[SystemPackage], platform_id: str) -> bool:
+        """
+        Install packages that share the same flags in a single package manager call.
+        
+        Pinned versions are requested as name=version on Debian platforms. Returns False
+        without raising if the call fails, so the caller can retry package by package.
+        """
+        install_cmd = self._get_package_manager_command()
+        install_cmd.extend(packages[0].flags)
+        pin_versions = platform_id in _DEBIAN_FAMILY
+        targets = [f"{package.name}={package.version}" if pin_versions and package.version else package.name
+                   for package in packages]
+        
+        self.logger.info(f"Installing {len(packages)} system packages together: {', '.join(targets)}")
+        for package in packages:
+            self._version_cache.pop(package.name, None)
+        try:
+            self._run_command(install_cmd + targets, stream_output=True, stdout_to_log=self._log_install_output())
+        except Exception as e:
+            self.logger.warning(f"⚠️  Combined install failed, retrying one package at a time: {str(e)}")
+            return False
+        
+        # Get the actually installed versions for logging
+        installed = self._get_installed_packages_bulk([package.name for package in packages])
+        for package in packages:
+            installed_version = installed.get(package.name)
+            if installed_version:
+                self.logger.info(f"✅ Successfully installed {package.name} (version: {installed_version})")
+            else:
+                self.logger.info(f"✅ Successfully installed {package.name}")
+        return True
+    
     def _install_single_system_package(self, package: SystemPackage, platform_id: str) -> bool:
         """
         Install a single system package with fallback mechanism.
@@ -349,6 +563,9 @@ class PackageManager:
         Returns:
             bool: True if package was successfully installed, False otherwise
         """
+        # Whatever happens below, a previously looked-up version is stale
+        self._version_cache.pop(package.name, None)
+        
         try:
             # Build base install command
             install_cmd = self._get_package_manager_command()
@@ -360,7 +577,7 @@ class PackageManager:
                     self.logger.debug(f"DEBUG: Using package flags for {package.name}: {package.flags}")
             
             # First attempt: try with pinned version if specified
-            if package.version and platform_id in ["debian", "ubuntu"]:
+            if package.version and platform_id in _DEBIAN_FAMILY:
                 pinned_package = f"{package.name}={package.version}"
                 pinned_cmd = install_cmd + [pinned_package]
                 
@@ -369,7 +586,7 @@ class PackageManager:
                     self.logger.debug(f"DEBUG: Pinned install command: {' '.join(pinned_cmd)}")
                 
                 try:
-                    self._run_command(pinned_cmd)
+                    self._run_command(pinned_cmd, stream_output=True, stdout_to_log=self._log_install_output())
                     self.logger.info(f"✅ Successfully installed {package.name}={package.version}")
                     return True
                     
@@ -388,7 +605,7 @@ class PackageManager:
                         self.logger.debug(f"DEBUG: Fallback install command: {' '.join(unpinned_cmd)}")
                     
                     try:
-                        self._run_command(unpinned_cmd)
+                        self._run_command(unpinned_cmd, stream_output=True, stdout_to_log=self._log_install_output())
                         
                         # Get the actually installed version for logging
                         installed_version = self._get_installed_package_version(package.name)
@@ -425,7 +642,7 @@ class PackageManager:
                 if hasattr(self.logger, 'debug'):
                     self.logger.debug(f"DEBUG: Direct install command: {' '.join(direct_cmd)}")
                 
-                self._run_command(direct_cmd)
+                self._run_command(direct_cmd, stream_output=True, stdout_to_log=self._log_install_output())
                 
                 # Get the actually installed version for logging
                 installed_version = self._get_installed_package_version(package.name)
@@ -454,9 +671,9 @@ class PackageManager:
         try:
             platform_id = self._detect_system_platform()
             
-            if platform_id in ["debian", "ubuntu"]:
+            if platform_id in _DEBIAN_FAMILY:
                 remove_cmd = ["apt-get", "remove", "-y"] + packages
-            elif platform_id in ["rhel", "centos", "fedora"]:
+            elif platform_id in _RPM_FAMILY:
                 remove_cmd = ["dnf", "remove", "-y"] + packages
             elif platform_id == "arch":
                 remove_cmd = ["pacman", "-R", "--noconfirm"] + packages
@@ -465,7 +682,9 @@ class PackageManager:
                 return False
             
             self.logger.info(f"Removing system packages: {', '.join(packages)}")
-            self._run_command(remove_cmd)
+            for package in packages:
+                self._version_cache.pop(package, None)
+            self._run_command(remove_cmd, stream_output=True)
             
             return True
             
@@ -500,12 +719,18 @@ class PackageManager:
     def get_current_pip_packages(self) -> Dict[str, str]:
         """Get currently installed pip packages."""
         try:
-            result = self._run_command([f"{self.venv_path}/bin/pip", "freeze"])
-            current_packages = {}
-            for line in result.stdout.split('\n'):
-                if '==' in line:
-                    name, version = line.split('==', 1)
-                    current_packages[name.lower()] = version
+            cmd = [f"{self.venv_path}/bin/pip", "freeze"]
+            self.logger.debug(f"Running command: {' '.join(cmd)}")
+            # Build the dict as pip writes lines rather than splitting the whole output
+            with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True) as proc:
+                current_packages = {
+                    name.lower(): version
+                    for line in proc.stdout if '==' in line
+                    for name, version in (line.rstrip().split('==', 1),)
+                }
+                returncode = proc.wait()
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, cmd)
             return current_packages
         except Exception as e:
             self.logger.warning(f"Could not get current Python packages: {str(e)}")
@@ -517,8 +742,8 @@ class PackageManager:
             if not os.path.exists(self.package_json_path):
                 return {}
                 
-            with open(self.package_json_path, 'r') as f:
-                package_data = json.load(f)
+            with open(self.package_json_path, 'rb') as f:
+                package_data = _json_loads(f.read())
             
             packages = {}
             for section in ["dependencies", "devDependencies"]:
@@ -540,12 +765,11 @@ class PackageManager:
             self.logger.info("Installing Python requirements")
             self._run_command([
                 f"{self.venv_path}/bin/pip", "install", "-r", requirements_file
-            ])
+            ], stream_output=True)
             
             # Track installed packages for rollback
             with open(requirements_file, 'r') as f:
-                packages = [line.strip().split('==')[0] for line in f 
-                          if line.strip() and not line.startswith('#') and '==' in line]
+                packages = [name for name, _ in _PINNED_REQUIREMENT_RE.findall(f.read())]
             
             if not self.installation_state.installed_packages.get("pip"):
                 self.installation_state.installed_packages["pip"] = []
@@ -565,16 +789,16 @@ class PackageManager:
             return True
         
         try:
-            with open(patch_file, 'r') as f:
-                patch_data = json.load(f)
+            with open(patch_file, 'rb') as f:
+                patch_data = _json_loads(f.read())
             
             if not patch_data:  # Empty patch
                 self.logger.info("Empty NPM patch, skipping")
                 return True
             
             # Read current package.json
-            with open(self.package_json_path, 'r') as f:
-                package_data = json.load(f)
+            with open(self.package_json_path, 'rb') as f:
+                package_data = _json_loads(f.read())
             
             # Create backup
             self.installation_state.package_json_backup = self.create_backup(self.package_json_path)
@@ -582,15 +806,12 @@ class PackageManager:
             # Apply patch
             for section in ["dependencies", "devDependencies"]:
                 if section in patch_data:
-                    if section not in package_data:
-                        package_data[section] = {}
+                    existing = package_data.setdefault(section, {})
+                    patch_section = patch_data[section]
                     
-                    # Track new packages for rollback
-                    new_packages = []
-                    for name, version in patch_data[section].items():
-                        if name not in package_data[section]:
-                            new_packages.append(name)
-                        package_data[section][name] = version
+                    # Track new packages for rollback (sorted so the order is stable)
+                    new_packages = sorted(patch_section.keys() - existing.keys())
+                    existing.update(patch_section)
                     
                     if new_packages:
                         if not self.installation_state.installed_packages.get("npm"):
@@ -598,12 +819,12 @@ class PackageManager:
                         self.installation_state.installed_packages["npm"].extend(new_packages)
             
             # Write updated package.json
-            with open(self.package_json_path, 'w') as f:
-                json.dump(package_data, f, indent=2)
+            with open(self.package_json_path, 'wb') as f:
+                f.write(_json_dumps(package_data))
             
             # Install new packages
             self.logger.info("Installing NPM packages")
-            self._run_command(["npm", "install"], cwd=os.path.dirname(self.package_json_path))
+            self._run_command(["npm", "install"], cwd=os.path.dirname(self.package_json_path), stream_output=True)
             
             self.logger.info("NPM patch applied successfully")
             return True
@@ -624,18 +845,16 @@ class PackageManager:
         
         try:
             with open(requirements_file, 'r') as f:
-                new_requirements = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+                pinned_requirements = _PINNED_REQUIREMENT_RE.findall(f.read())
             
             # Get current venv packages
             current_packages = self.get_current_pip_packages()
             
             # Check for direct version conflicts first
-            for req in new_requirements:
-                if '==' in req:
-                    name, version = req.split('==', 1)
-                    name = name.lower()
-                    if name in current_packages and current_packages[name] != version:
-                        conflicts.append(f"Python package {name}: current={current_packages[name]}, required={version}")
+            for name, version in pinned_requirements:
+                name = name.lower()
+                if name in current_packages and current_packages[name] != version:
+                    conflicts.append(f"Python package {name}: current={current_packages[name]}, required={version}")
             
             # If no direct conflicts, perform dependency resolution check
             if not conflicts:
@@ -714,8 +933,8 @@ class PackageManager:
             return conflicts
         
         try:
-            with open(patch_file, 'r') as f:
-                patch_data = json.load(f)
+            with open(patch_file, 'rb') as f:
+                patch_data = _json_loads(f.read())
             
             if not patch_data:  # Empty patch
                 return conflicts
@@ -774,7 +993,7 @@ class PackageManager:
                 elif package_type == "npm" and packages:
                     self.logger.info(f"Uninstalling NPM packages: {', '.join(packages)}")
                     self._run_command(["npm", "uninstall"] + packages, 
-                                    cwd=os.path.dirname(self.package_json_path))
+                                    cwd=os.path.dirname(self.package_json_path), stream_output=True)
                 elif package_type == "system" and packages:
                     # Only remove packages that were not previously installed
                     packages_to_remove = []
@@ -831,8 +1050,8 @@ class PackageManager:
                 return False
             
             # Validate package.json syntax
-            with open(self.package_json_path, 'r') as f:
-                json.load(f)
+            with open(self.package_json_path, 'rb') as f:
+                _json_loads(f.read())
             
             self.logger.debug("NPM environment validation successful")
             return True
@@ -902,7 +1121,7 @@ class PackageManager:
             self.logger.info(f"Uninstalling {len(packages_to_remove)} Python packages: {', '.join(packages_to_remove)}")
             self._run_command([
                 f"{self.venv_path}/bin/pip", "uninstall", "-y"
-            ] + packages_to_remove)
+            ] + packages_to_remove, stream_output=True)
             
             self.logger.info("Python packages uninstalled successfully")
             return True
@@ -920,7 +1139,7 @@ class PackageManager:
         try:
             self.logger.info(f"Removing NPM packages: {', '.join(packages)}")
             self._run_command(["npm", "uninstall"] + packages, 
-                            cwd=os.path.dirname(self.package_json_path))
+                            cwd=os.path.dirname(self.package_json_path), stream_output=True)
             
             self.logger.info("NPM packages removed successfully")
             return True
@@ -936,16 +1155,16 @@ class PackageManager:
             return True
         
         try:
-            with open(patch_file, 'r') as f:
-                patch_data = json.load(f)
+            with open(patch_file, 'rb') as f:
+                patch_data = _json_loads(f.read())
             
             if not patch_data:  # Empty patch
                 self.logger.info("Empty NPM patch, nothing to revert")
                 return True
             
             # Read current package.json
-            with open(self.package_json_path, 'r') as f:
-                package_data = json.load(f)
+            with open(self.package_json_path, 'rb') as f:
+                package_data = _json_loads(f.read())
             
             # Create backup
             backup_path = self.create_backup(self.package_json_path)
@@ -972,8 +1191,8 @@ class PackageManager:
                 return True
             
             # Write updated package.json
-            with open(self.package_json_path, 'w') as f:
-                json.dump(package_data, f, indent=2)
+            with open(self.package_json_path, 'wb') as f:
+                f.write(_json_dumps(package_data))
             
             # Remove packages from node_modules
             if packages_to_remove:
@@ -1021,8 +1240,8 @@ class PackageManager:
             return packages
         
         try:
-            with open(patch_file, 'r') as f:
-                patch_data = json.load(f)
+            with open(patch_file, 'rb') as f:
+                patch_data = _json_loads(f.read())
             
             for section in ["dependencies", "devDependencies"]:
                 if section in patch_data:
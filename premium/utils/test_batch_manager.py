@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the BatchManager tab checksum cache
+
+Checks that checksums are recorded for installed tabs, that an unchanged tab
+is recognized by a later batch, that edits invalidate it, and that
+discard_tab_checksum forgets a tab so its next install is never skipped.
+
+Usage:
+    python3 test_batch_manager.py
+"""
+
+import sys
+import tempfile
+import os
+import json
+import logging
+
+# Add the premium directory to the path so the utils package can be imported
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.batch_manager import BatchManager, discard_tab_checksum
+
+LOGGER = logging.getLogger("test_batch_manager")
+
+def _make_tab(temp_dir, name="demoTab"):
+    """Create a small tab source tree and return its path."""
+    tab_path = os.path.join(temp_dir, "premium", name)
+    os.makedirs(os.path.join(tab_path, "backend"))
+    with open(os.path.join(tab_path, "index.json"), "w") as f:
+        json.dump({"name": name, "version": "1.0.0"}, f)
+    with open(os.path.join(tab_path, "backend", "routes.py"), "w") as f:
+        f.write("bp = None\n")
+    return tab_path
+
+def _new_batch(cache_path, tab_path):
+    """Start a fresh batch for one tab, loading the persisted checksum cache like a new run does."""
+    manager = BatchManager(LOGGER, checksum_cache_path=cache_path)
+    manager.batch_state = manager._initialize_batch_managers(LOGGER)
+    manager.batch_state.tabs_to_install = [tab_path]
+    return manager
+
+def test_record_and_skip():
+    """Test that a recorded tab is seen as unchanged by the next batch."""
+    print("Testing Checksum Record and Skip...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tab_path = _make_tab(temp_dir)
+        cache_path = os.path.join(temp_dir, "checksums", "checksums.json")
+
+        manager = _new_batch(cache_path, tab_path)
+        assert not manager._tab_unchanged("demoTab", tab_path)
+        manager._record_tab_checksums(["demoTab"], LOGGER)
+
+        with open(cache_path) as f:
+            cached = json.load(f)
+        assert cached["demoTab"]["files"] == 2
+        print("  ✓ checksum persisted after a successful install")
+
+        assert _new_batch(cache_path, tab_path)._tab_unchanged("demoTab", tab_path)
+        print("  ✓ next batch skips the unchanged tab")
+
+        # Same size, new content and mtime: the hash must be recomputed and differ
+        routes_path = os.path.join(tab_path, "backend", "routes.py")
+        with open(routes_path, "w") as f:
+            f.write("bp = 1234\n")
+        stat = os.stat(routes_path)
+        os.utime(routes_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert not _new_batch(cache_path, tab_path)._tab_unchanged("demoTab", tab_path)
+        print("  ✓ edited tab is reinstalled")
+
+    print()
+
+def test_discard():
+    """Test that discard_tab_checksum forgets one tab and tolerates a missing cache."""
+    print("Testing Checksum Discard...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tab_path = _make_tab(temp_dir)
+        other_path = _make_tab(temp_dir, "otherTab")
+        cache_path = os.path.join(temp_dir, "checksums", "checksums.json")
+
+        assert discard_tab_checksum("demoTab", cache_path)
+        print("  ✓ discarding with no cache file succeeds")
+
+        manager = _new_batch(cache_path, tab_path)
+        manager.batch_state.tabs_to_install.append(other_path)
+        manager._record_tab_checksums(["demoTab", "otherTab"], LOGGER)
+
+        assert discard_tab_checksum("demoTab", cache_path)
+        assert not _new_batch(cache_path, tab_path)._tab_unchanged("demoTab", tab_path)
+        assert _new_batch(cache_path, other_path)._tab_unchanged("otherTab", other_path)
+        print("  ✓ discarded tab is reinstalled, other tabs keep their checksum")
+
+        assert discard_tab_checksum("demoTab", cache_path)
+        print("  ✓ discarding an unknown tab succeeds")
+
+        with open(cache_path, "w") as f:
+            f.write("{not json")
+        assert not discard_tab_checksum("demoTab", cache_path)
+        print("  ✓ unreadable cache reports failure")
+
+    print()
+
+def main():
+    """Run all tests."""
+    print("Batch Manager Checksum Cache Test Suite")
+    print("=" * 50)
+    print()
+
+    try:
+        test_record_and_skip()
+        test_discard()
+
+        print("All tests completed!")
+
+    except Exception as e:
+        print(f"Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
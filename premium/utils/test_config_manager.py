@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test script for ConfigManager transactions
+
+Checks that transaction() writes all of its changes once on a clean exit,
+discards them on an exception, lets nested transactions join the outermost one,
+and leaves homeserver.json untouched when validation rejects the result.
+
+Usage:
+    python3 test_config_manager.py
+"""
+
+import sys
+import tempfile
+import os
+import json
+import logging
+
+# Add the premium directory to the path so the utils package can be imported
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config_manager import ConfigManager, ConfigTransactionError
+
+INITIAL_CONFIG = {"tabs": {"stats": {"config": {"order": 1}}}, "global": {"theme": "dark"}}
+
+def _valid_output(temp_dir):
+    """factoryFallback.sh output for a config that validates: the live config path."""
+    return os.path.join(temp_dir, "homeserver.json")
+
+def _make_manager(temp_dir, validation_output):
+    """Build a ConfigManager over a temp config whose factoryFallback.sh prints validation_output."""
+    config_path = os.path.join(temp_dir, "homeserver.json")
+    with open(config_path, "w") as f:
+        json.dump(INITIAL_CONFIG, f)
+
+    script_path = os.path.join(temp_dir, "factoryFallback.sh")
+    with open(script_path, "w") as f:
+        f.write(f"#!/bin/sh\necho {validation_output}\n")
+    os.chmod(script_path, 0o755)
+
+    manager = ConfigManager(logging.getLogger("test_config_manager"), config_path,
+                            script_path, os.path.join(temp_dir, "config.lock"))
+    # Keep the test user's ownership instead of chowning to www-data
+    manager._www_uid = manager._www_gid = -1
+
+    validations = []
+    run_factory_fallback = manager._run_factory_fallback
+    def counting_factory_fallback():
+        validations.append(True)
+        return run_factory_fallback()
+    manager._run_factory_fallback = counting_factory_fallback
+    return manager, config_path, validations
+
+def _read_config(path):
+    with open(path) as f:
+        return json.load(f)
+
+def test_transaction_commit():
+    """Test that several set_config_value calls are validated and written once."""
+    print("Testing Transaction Commit...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, config_path, validations = _make_manager(temp_dir, _valid_output(temp_dir))
+        with manager.transaction():
+            assert manager.set_config_value("tabs.demo.config.order", 2)
+            assert manager.set_config_value("global.theme", "light")
+            # Nothing is written until the transaction ends
+            assert _read_config(config_path) == INITIAL_CONFIG
+            assert manager.get_config_value("global.theme") == "light"
+
+        config = _read_config(config_path)
+        assert config["tabs"]["demo"]["config"]["order"] == 2
+        assert config["global"]["theme"] == "light"
+        assert config["tabs"]["stats"] == INITIAL_CONFIG["tabs"]["stats"]
+        assert len(validations) == 1
+        print("  ✓ both changes written with a single validation")
+
+    print()
+
+def test_transaction_rollback():
+    """Test that an exception inside the transaction discards its changes."""
+    print("Testing Transaction Rollback on Exception...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, config_path, validations = _make_manager(temp_dir, _valid_output(temp_dir))
+        try:
+            with manager.transaction():
+                manager.set_config_value("global.theme", "light")
+                raise RuntimeError("patch failed")
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("exception was swallowed by the transaction")
+
+        assert _read_config(config_path) == INITIAL_CONFIG
+        assert manager.get_config_value("global.theme") == "dark"
+        assert not validations
+        print("  ✓ config unchanged and never validated")
+
+    print()
+
+def test_nested_transaction_joins_outer():
+    """Test that an inner transaction's changes are written only when the outer one commits."""
+    print("Testing Nested Transactions...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, config_path, validations = _make_manager(temp_dir, _valid_output(temp_dir))
+        with manager.transaction():
+            manager.set_config_value("global.theme", "light")
+            with manager.transaction():
+                manager.set_config_value("global.language", "en")
+            assert _read_config(config_path) == INITIAL_CONFIG
+
+        config = _read_config(config_path)
+        assert config["global"] == {"theme": "light", "language": "en"}
+        assert len(validations) == 1
+        print("  ✓ inner changes committed once, with the outer transaction")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, config_path, validations = _make_manager(temp_dir, _valid_output(temp_dir))
+        try:
+            with manager.transaction():
+                manager.set_config_value("global.theme", "light")
+                with manager.transaction():
+                    manager.set_config_value("global.language", "en")
+                raise RuntimeError("later step failed")
+        except RuntimeError:
+            pass
+
+        assert _read_config(config_path) == INITIAL_CONFIG
+        print("  ✓ outer failure discards the inner changes too")
+
+    print()
+
+def test_transaction_validation_failure():
+    """Test that a config rejected by factoryFallback.sh is not kept."""
+    print("Testing Transaction Validation Failure...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, config_path, validations = _make_manager(temp_dir, "/etc/homeserver.factory")
+        try:
+            with manager.transaction():
+                manager.set_config_value("global.theme", "light")
+        except ConfigTransactionError:
+            pass
+        else:
+            raise AssertionError("rejected config did not raise ConfigTransactionError")
+
+        assert _read_config(config_path) == INITIAL_CONFIG
+        assert len(validations) == 1
+        print("  ✓ ConfigTransactionError raised and original config kept")
+
+    print()
+
+def main():
+    """Run all tests."""
+    print("Config Manager Transaction Test Suite")
+    print("=" * 50)
+    print()
+
+    try:
+        test_transaction_commit()
+        test_transaction_rollback()
+        test_nested_transaction_joins_outer()
+        test_transaction_validation_failure()
+
+        print("All tests completed!")
+
+    except Exception as e:
+        print(f"Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test script for the File Operations blueprint append/remove
+
+Runs append -> remove against fixture backend __init__.py files and checks that
+blocks land inside the markers with the right indentation and that removal
+restores the original file byte for byte.
+
+Usage:
+    python3 test_file_operations.py
+"""
+
+import sys
+import tempfile
+import os
+import logging
+
+# Add the current directory to the path so we can import the file operations manager
+sys.path.insert(0, os.path.dirname(__file__))
+
+from file_operations import FileOperationsManager, FileOperation
+
+MARKER = "PREMIUM TAB BLUEPRINTS"
+
+FIXTURE_INIT = (
+    "from flask import Flask\n"
+    "\n"
+    "def create_app():\n"
+    "    app = Flask(__name__)\n"
+    "    app.register_blueprint(core_bp)\n"
+    "\n"
+    "    # === PREMIUM TAB BLUEPRINTS START ===\n"
+    "    # Premium tab blueprints are dynamically injected here during installation\n"
+    "    \n"
+    "    # === PREMIUM TAB BLUEPRINTS END ===\n"
+    "\n"
+    "    return app\n"
+)
+
+def _setup(temp_dir, init_content, source_name="backend", source_content=None):
+    """Write a fixture __init__.py and a tab directory; return (manager, operation, tab_path)."""
+    init_path = os.path.join(temp_dir, "__init__.py")
+    with open(init_path, "wb") as f:
+        f.write(init_content.encode())
+
+    tab_path = os.path.join(temp_dir, "demoTab")
+    os.makedirs(os.path.join(tab_path, source_name))
+    if source_content is not None:
+        with open(os.path.join(tab_path, source_name, "snippet.py"), "wb") as f:
+            f.write(source_content.encode())
+
+    manager = FileOperationsManager(logging.getLogger("test_file_operations"))
+    operation = FileOperation(
+        source=f"{source_name}/snippet.py",
+        target=init_path,
+        operation_type="append",
+        identifier="demoTab",
+        marker=MARKER
+    )
+    return manager, operation, tab_path
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read().decode()
+
+def test_append_remove_round_trip():
+    """Test that a backend blueprint block is inserted inside the markers and removed cleanly."""
+    print("Testing Append/Remove Round Trip...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, operation, tab_path = _setup(temp_dir, FIXTURE_INIT)
+
+        assert manager.perform_append_operation(operation, tab_path)
+        content = _read(operation.target)
+        expected_block = (
+            "    # PREMIUM_TAB_IDENTIFIER: demoTab\n"
+            "    # Demotab Premium Tab Blueprint Registration\n"
+            "    from .demoTab.routes import bp as demoTab_bp\n"
+            "    app.register_blueprint(demoTab_bp)\n"
+            "    # END_PREMIUM_TAB_IDENTIFIER: demoTab\n"
+            "    # === PREMIUM TAB BLUEPRINTS END ===\n"
+        )
+        assert expected_block in content, content
+        assert content.index("BLUEPRINTS START") < content.index("PREMIUM_TAB_IDENTIFIER: demoTab")
+        print("  ✓ block inserted before the end marker with 4-space indentation")
+
+        assert manager.remove_appended_content(operation.target, "demoTab")
+        assert _read(operation.target) == FIXTURE_INIT
+        print("  ✓ removal restores the original file")
+
+        # Removing again is a no-op
+        assert manager.remove_appended_content(operation.target, "demoTab")
+        assert _read(operation.target) == FIXTURE_INIT
+        print("  ✓ second removal is a no-op")
+
+    print()
+
+def test_indentation_detection():
+    """Test indentation taken from existing registrations, then from the start marker."""
+    print("Testing Indentation Detection...")
+
+    # Registrations at 8 spaces win over the marker line's indentation
+    nested = FIXTURE_INIT.replace("    app.register_blueprint(core_bp)\n",
+                                  "    if True:\n        app.register_blueprint(core_bp)\n")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, operation, tab_path = _setup(temp_dir, nested)
+        assert manager.perform_append_operation(operation, tab_path)
+        assert "\n        # PREMIUM_TAB_IDENTIFIER: demoTab\n" in _read(operation.target)
+        print("  ✓ follows existing blueprint registration indentation")
+
+    # With no registrations, the start marker line sets the indentation
+    no_blueprints = FIXTURE_INIT.replace("    app.register_blueprint(core_bp)\n", "").replace(
+        "    # === PREMIUM TAB BLUEPRINTS", "  # === PREMIUM TAB BLUEPRINTS")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, operation, tab_path = _setup(temp_dir, no_blueprints)
+        assert manager.perform_append_operation(operation, tab_path)
+        content = _read(operation.target)
+        assert "\n  # PREMIUM_TAB_IDENTIFIER: demoTab\n  # Demotab" in content, content
+        assert manager.remove_appended_content(operation.target, "demoTab")
+        assert _read(operation.target) == no_blueprints
+        print("  ✓ falls back to the start marker's indentation")
+
+    print()
+
+def test_existing_identifier():
+    """Test that appending an identifier already present leaves the file untouched."""
+    print("Testing Existing Identifier...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, operation, tab_path = _setup(temp_dir, FIXTURE_INIT)
+        assert manager.perform_append_operation(operation, tab_path)
+        once = _read(operation.target)
+
+        assert manager.perform_append_operation(operation, tab_path)
+        assert _read(operation.target) == once
+        assert once.count("# PREMIUM_TAB_IDENTIFIER: demoTab") == 1
+        print("  ✓ second append is skipped")
+
+    print()
+
+def test_missing_markers():
+    """Test that append fails and remove refuses half-marked blocks without touching the file."""
+    print("Testing Missing Markers...")
+
+    without_markers = "from flask import Flask\n\napp = Flask(__name__)\n"
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, operation, tab_path = _setup(temp_dir, without_markers)
+        assert not manager.perform_append_operation(operation, tab_path)
+        assert _read(operation.target) == without_markers
+        print("  ✓ append without section markers fails and leaves the file unchanged")
+
+    unterminated = FIXTURE_INIT.replace(
+        "    # === PREMIUM TAB BLUEPRINTS END ===\n",
+        "    # PREMIUM_TAB_IDENTIFIER: demoTab\n    app.register_blueprint(demoTab_bp)\n"
+        "    # === PREMIUM TAB BLUEPRINTS END ===\n")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, operation, tab_path = _setup(temp_dir, unterminated)
+        assert not manager.remove_appended_content(operation.target, "demoTab")
+        assert _read(operation.target) == unterminated
+        print("  ✓ removal without an end identifier fails and leaves the file unchanged")
+
+    print()
+
+def test_crlf_input():
+    """Test CRLF in the source snippet and in the target file."""
+    print("Testing CRLF Input...")
+
+    crlf_init = FIXTURE_INIT.replace("\n", "\r\n")
+    snippet = "from .demoTab.routes import bp as demoTab_bp\r\napp.register_blueprint(demoTab_bp)\r\n"
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager, operation, tab_path = _setup(temp_dir, crlf_init, source_name="frontend",
+                                              source_content=snippet)
+        assert manager.perform_append_operation(operation, tab_path)
+        content = _read(operation.target)
+        assert (
+            "    # PREMIUM_TAB_IDENTIFIER: demoTab\n"
+            "    from .demoTab.routes import bp as demoTab_bp\n"
+            "    app.register_blueprint(demoTab_bp)\n"
+            "    # END_PREMIUM_TAB_IDENTIFIER: demoTab\n"
+        ) in content, content
+        print("  ✓ CRLF snippet is normalized to LF lines")
+
+        assert manager.remove_appended_content(operation.target, "demoTab")
+        assert _read(operation.target) == crlf_init
+        print("  ✓ removal restores the CRLF file unchanged")
+
+    print()
+
+def main():
+    """Run all tests."""
+    print("File Operations Append/Remove Test Suite")
+    print("=" * 50)
+    print()
+
+    try:
+        test_append_remove_round_trip()
+        test_indentation_detection()
+        test_existing_identifier()
+        test_missing_markers()
+        test_crlf_input()
+
+        print("All tests completed!")
+
+    except Exception as e:
+        print(f"Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the Premium JSON Lines logger
+
+Checks that category clears are written and honoured on read-back, that
+compaction drops only records superseded by a clear, and that a fresh reader
+of the file sees the same per-category view as the logger that wrote it.
+
+Usage:
+    python3 test_logger.py
+"""
+
+import sys
+import tempfile
+import os
+import json
+
+# Add the premium directory to the path so the utils package can be imported
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import logger as premium_logger
+from utils.logger import PremiumJSONLogger, read_log_categories
+
+def _read_back(log_file):
+    """Rebuild the per-category view from the file alone, as the web backend does."""
+    with open(log_file, encoding="utf-8") as f:
+        return read_log_categories(f)
+
+def _records(log_file):
+    with open(log_file, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_clear_and_read_back():
+    """Test that a clear starts a category over, in memory and on disk."""
+    print("Testing Clear and Read-Back...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_file = os.path.join(temp_dir, "premium_installer.jsonl")
+        json_logger = PremiumJSONLogger(log_file)
+
+        json_logger.log_message("install", "info", "first run")
+        json_logger.log_message("git", "info", "cloned")
+        json_logger.clear_category("install")
+        json_logger.log_message("install", "error", "second run")
+        json_logger.close()
+
+        assert json_logger.get_category_logs("install")["messages"] == ["error: second run"]
+        on_disk = _read_back(log_file)
+        assert on_disk["install"]["messages"] == ["error: second run"]
+        assert on_disk["git"]["messages"] == ["info: cloned"]
+        print("  ✓ cleared category holds only later messages; others are kept")
+
+        # A record appended by another process is cleared even though this view never saw it
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ts": "x", "cat": "validate", "lvl": "info", "msg": "other process"}) + "\n")
+        json_logger.clear_category("validate")
+        json_logger.close()
+        assert _read_back(log_file)["validate"]["messages"] == []
+        print("  ✓ clear is written even when this process's view is empty")
+
+        # A torn final line is ignored by readers
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write('{"ts": "x", "cat": "git", "lv')
+        assert _read_back(log_file)["git"]["messages"] == ["info: cloned"]
+        print("  ✓ torn trailing record is skipped")
+
+    print()
+
+def test_compaction():
+    """Test that compaction drops superseded records and keeps the view intact."""
+    print("Testing Compaction...")
+
+    original_limit = premium_logger.LOG_COMPACT_BYTES
+    premium_logger.LOG_COMPACT_BYTES = 1
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, "premium_installer.jsonl")
+            json_logger = PremiumJSONLogger(log_file)
+
+            for index in range(5):
+                json_logger.log_message("install", "info", f"old {index}")
+            json_logger.log_message("git", "info", "kept")
+            json_logger.close()
+            before = len(_records(log_file))
+
+            json_logger.clear_category("install")
+            json_logger.log_message("install", "info", "new")
+            json_logger.close()
+
+            records = _records(log_file)
+            assert len(records) < before + 2
+            assert not any(record.get("msg", "").startswith("old") for record in records)
+            assert _read_back(log_file) == {
+                category: entry for category, entry in json_logger.get_all_logs().items()
+                if entry["last_updated"] is not None
+            }
+            print("  ✓ records before the clear are dropped; read-back matches the logger's view")
+
+            # Nothing left to drop: further flushes append without rewriting
+            inode = os.stat(log_file).st_ino
+            json_logger.log_message("git", "info", "more")
+            json_logger.close()
+            assert os.stat(log_file).st_ino == inode
+            assert _records(log_file)[-1]["msg"] == "more"
+            print("  ✓ log that cannot shrink is not rewritten again")
+    finally:
+        premium_logger.LOG_COMPACT_BYTES = original_limit
+
+    print()
+
+def main():
+    """Run all tests."""
+    print("Premium JSON Logger Test Suite")
+    print("=" * 50)
+    print()
+
+    try:
+        test_clear_and_read_back()
+        test_compaction()
+
+        print("All tests completed!")
+
+    except Exception as e:
+        print(f"Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,6 +17,7 @@ from .package_manager import PackageManager
 from .config_manager import ConfigManager, ServiceManager, BuildManager
 from .validation import ValidationManager
 from .installation_tracker import InstallationTracker
+from .batch_manager import discard_tab_checksum
 
 
 class UninstallManager:
@@ -574,6 +575,13 @@ class UninstallManager:
             # Also clean up empty backend directories
             self.file_operations.remove_empty_directories(backend_dir)
             
+            # Installed-tab scans must not reuse results from before the removal
+            self.installation_tracker.invalidate()
+            
+            # A later reinstall must not be skipped as unchanged against this removed install
+            if not discard_tab_checksum(tab_name):
+                self.logger.warning(f"Failed to clear installed checksum for tab: {tab_name}")
+            
             # 5.5. Clean up development artifacts from source directory
             source_dir = installation_data.get("source_directory")
             if source_dir and os.path.exists(source_dir):
@@ -575,8 +575,8 @@ class ValidationManager:
                 finally:
                     # Restore original config or clean up test copy
                     if original_existed and os.path.exists(temp_backup):
-                        # Original existed: restore it
-                        shutil.move(temp_backup, homeserver_config_path)
+                        # Original existed: restore it (same directory, so a plain rename)
+                        os.replace(temp_backup, homeserver_config_path)
                     elif not original_existed and os.path.exists(homeserver_config_path):
                         # Original didn't exist and validation may have failed: only remove if validation failed
                         # (If validation succeeded, the caller will move the temp file to final location)